@@ -1,8 +1,10 @@
- #!/usr/bin/env bash
+#!/usr/bin/env bash
 set -o errexit
 
 pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
 
-python manage.py migrate
\ No newline at end of file
+python manage.py check_static
+
+python manage.py migrate
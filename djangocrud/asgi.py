@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangocrud.settings')
 
 application = get_asgi_application()
+
+# Después de django.setup(): URLs, plantillas, BBDD y gc.freeze(). uvicorn
+# importa este módulo en cada worker y no acepta conexiones hasta terminar,
+# así que el warm-up corre antes de la primera petición y /readyz nunca
+# responde "warming up" bajo ASGI (sí sigue comprobando la BBDD). Sin fork
+# no hay memoria que compartir; gc.freeze() solo saca los objetos del
+# arranque de las pasadas del recolector.
+from djangocrud import warmup  # noqa: E402 pylint: disable=wrong-import-position
+
+warmup.run()
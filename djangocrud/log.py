@@ -0,0 +1,164 @@
+"""
+Logging sin bloquear el hilo de la petición.
+
+QueueHandler deja cada registro en una cola en memoria y un hilo de fondo
+(QueueListener) lo formatea y lo escribe en el stream. La petición solo paga
+el append a la cola; la serialización a texto o JSON y la escritura en
+stdout (que puede bloquearse si el colector de logs va lento) ocurren fuera.
+
+RateLimitFilter limita cuántos registros por segundo deja pasar un logger
+(token bucket). Se usa sobre django.db.backends, que con DEBUG=True emite una
+línea por cada consulta SQL: en lugar de miles de líneas por segundo se
+conserva una muestra, y el siguiente registro que pasa lleva en
+`sampled_dropped` cuántos se descartaron.
+
+JsonFormatter produce una línea JSON por registro, con los campos `extra`
+(por ejemplo `profile` de ProfilingMiddleware).
+
+La configuración está en settings.LOGGING y se controla con variables de
+entorno (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_SQL_RATE).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# Atributos propios de LogRecord; el resto son campos `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime'}
+
+
+def parse_levels(value):
+    """
+    "django.db.backends=DEBUG,tasks=INFO" -> {'django.db.backends': 'DEBUG', ...}
+    """
+    levels = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Una línea JSON por registro.
+    """
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update({key: value for key, value in vars(record).items()
+                     if key not in _RECORD_ATTRS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket: deja pasar en promedio `rate` registros por segundo con
+    ráfagas de hasta `burst`. rate=0 descarta todo; rate<0 no limita.
+    """
+
+    def __init__(self, rate=10, burst=None):
+        super().__init__()
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(self.rate, 1))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate < 0:
+            return True
+        if self.rate == 0:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.dropped += 1
+                return False
+            self.tokens -= 1
+            if self.dropped:
+                record.sampled_dropped = self.dropped
+                self.dropped = 0
+        return True
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler con su propio QueueListener hacia un StreamHandler.
+
+    Se configura desde LOGGING como cualquier handler:
+        'class': 'djangocrud.log.QueueHandler', 'stream': 'ext://sys.stdout',
+        'formatter': 'json'
+    El formatter se aplica en el hilo del listener, no en el de la petición.
+    El listener se vuelve a arrancar en los procesos hijos de un fork (gunicorn
+    --preload), donde el hilo original no existe.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = None
+        self._start()
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def _after_fork(self):
+        if self.listener is None:
+            return
+        self.queue = queue.SimpleQueue()
+        self._start()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Solo resuelve msg % args (y el traceback, que no conviene retener);
+        el formateo completo lo hace el listener.
+        """
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def flush(self):
+        """
+        Espera a que el listener vacíe la cola (para tests y benchmarks).
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self._start()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
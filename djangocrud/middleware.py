@@ -0,0 +1,257 @@
+"""
+Middlewares del proyecto.
+
+HealthCheckMiddleware responde /healthz y /readyz (ver su docstring).
+
+ProfilingMiddleware mide, en una muestra de las peticiones, cuántas
+consultas SQL se hicieron y cuánto tardaron, cuánto tardó el renderizado de
+plantillas y la vista, y lo devuelve en el header Server-Timing (visible en
+la pestaña Network del navegador) y en una línea de log estructurada.
+
+Configuración (settings / variables de entorno):
+    PROFILING_SAMPLE_RATE  fracción de peticiones medidas, 0.0 a 1.0 (0 = apagado)
+    PROFILING_SLOW_MS      umbral en ms para loguear la petición como lenta
+
+Con el muestreo apagado el costo por petición es un random() y dos lecturas
+del reloj (para detectar peticiones lentas); el wrapper de SQL y el de
+plantillas solo se activan en las peticiones muestreadas. El de plantillas
+se instala al crear el middleware y solo si PROFILING_SAMPLE_RATE es mayor
+que 0: importar este módulo no cambia nada.
+
+En una cadena async (uvicorn) las consultas no corren en el hilo del
+middleware sino en el de sync_to_async, cuyas conexiones son otras: ahí el
+wrapper de SQL se instala en cada conexión al abrirse (connection_created) y
+fuera de las peticiones muestreadas solo cuesta leer la ContextVar.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.template.backends import django as django_backend
+
+from djangocrud import warmup
+
+logger = logging.getLogger('djangocrud.profiling')
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Acumuladores de una petición muestreada.
+    """
+    __slots__ = ('queries', 'sql', 'template', 'view_start', 'view')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.view_start = None
+        self.view = 0.0
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper: cuenta y cronometra cada consulta.
+    """
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.sql += time.perf_counter() - start
+
+
+def _install_sql_wrapper(sender, connection, **kwargs):  # pylint: disable=unused-argument
+    """
+    Receptor de connection_created: deja _sql_wrapper puesto en la conexión.
+    """
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_wrapper)
+
+
+_original_template_render = django_backend.Template.render
+
+
+def _profiled_template_render(self, context=None, request=None):
+    """
+    Reemplazo de Template.render del backend de Django. Solo cuenta el render
+    de nivel superior ({% extends %} e {% include %} quedan dentro).
+    """
+    profile = _current.get()
+    if profile is None:
+        return _original_template_render(self, context, request)
+    start = time.perf_counter()
+    try:
+        return _original_template_render(self, context, request)
+    finally:
+        profile.template += time.perf_counter() - start
+
+
+def _install_template_wrapper():
+    """
+    Pone _profiled_template_render en Template.render (una sola vez).
+    """
+    if django_backend.Template.render is not _profiled_template_render:
+        django_backend.Template.render = _profiled_template_render
+
+
+class HealthCheckMiddleware:
+    """
+    Sondas del balanceador / de Render. Va primera en MIDDLEWARE y responde
+    sin pasar por el resto: no lee la sesión, ni el usuario, ni valida el
+    Host (la sonda pega a la IP del contenedor).
+
+        /healthz  200 si el proceso atiende peticiones
+        /readyz   200 si terminó el warm-up y la BBDD responde; si no, 503
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        path = request.path_info.rstrip('/')
+        if path == '/healthz':
+            return self._response(200, 'ok')
+        if path == '/readyz':
+            return self._readyz()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        path = request.path_info.rstrip('/')
+        if path == '/healthz':
+            return self._response(200, 'ok')
+        if path == '/readyz':
+            return await sync_to_async(self._readyz)()
+        return await self.get_response(request)
+
+    def _readyz(self):
+        if not warmup.READY.is_set():
+            return self._response(503, 'warming up')
+        try:
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return self._response(503, 'database unavailable')
+        return self._response(200, 'ready')
+
+    @staticmethod
+    def _response(status, body):
+        response = HttpResponse(body + '\n', status=status,
+                                content_type='text/plain; charset=utf-8')
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Debe ir al principio de MIDDLEWARE para que el tiempo total y las
+    consultas incluyan sesión y autenticación.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        if settings.PROFILING_SAMPLE_RATE > 0:
+            _install_template_wrapper()
+            if self.async_mode:
+                connection_created.connect(_install_sql_wrapper,
+                                           dispatch_uid='djangocrud.profiling')
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self._check_slow(request, self.get_response(request), start)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with self._sql_wrappers():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, profile, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self._check_slow(request, await self.get_response(request), start)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            # Las consultas corren en el hilo de sync_to_async, con sus
+            # propias conexiones; allí el wrapper ya está (ver __init__)
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._report(request, response, profile, start)
+
+    @staticmethod
+    def _sql_wrappers():
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_sql_wrapper))
+        return stack
+
+    @staticmethod
+    def _check_slow(request, response, start):
+        total = (time.perf_counter() - start) * 1000
+        if total >= settings.PROFILING_SLOW_MS:
+            logger.warning('slow request method=%s path=%s status=%s total_ms=%.1f',
+                           request.method, request.path, response.status_code, total)
+        return response
+
+    @staticmethod
+    def _report(request, response, profile, start):
+        total = (time.perf_counter() - start) * 1000
+        if profile.view_start is not None:
+            profile.view = time.perf_counter() - profile.view_start
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={profile.sql * 1000:.1f};desc="{profile.queries} queries"',
+            f'tpl;dur={profile.template * 1000:.1f}',
+            f'view;dur={profile.view * 1000:.1f}',
+            f'total;dur={total:.1f}',
+        ])
+        data = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'sql_ms': round(profile.sql * 1000, 1),
+            'template_ms': round(profile.template * 1000, 1),
+            'view_ms': round(profile.view * 1000, 1),
+            'total_ms': round(total, 1),
+        }
+        level = logging.WARNING if total >= settings.PROFILING_SLOW_MS else logging.INFO
+        logger.log(level, 'request %s', ' '.join(f'{k}={v}' for k, v in data.items()),
+                   extra={'profile': data})
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        profile = _current.get()
+        if profile is not None:
+            profile.view_start = time.perf_counter()
@@ -0,0 +1,135 @@
+"""
+Lecturas desde réplicas de la BBDD, con read-your-writes por usuario.
+
+Las réplicas se configuran con DATABASE_REPLICA_URLS (URLs separadas por
+coma, ver settings.py) y quedan en DATABASES como replica1, replica2, ...
+
+ReplicaRouter manda a una réplica solo las lecturas hechas dentro de una
+vista marcada con @read_from_replica (el marcador es una ContextVar, así
+que vale también en las vistas async y en los hilos de sync_to_async). Todo
+lo demás, incluidas las escrituras, la sesión y el usuario, va a 'default'.
+
+Una réplica va unos milisegundos detrás del primario: si el usuario acaba de
+crear una tarea y la lista se leyera de la réplica, podría no verla.
+PrimaryStickinessMiddleware marca con una cookie cada petición que escribe
+(POST, PUT, PATCH, DELETE) y durante REPLICA_STICKY_SECONDS las lecturas de
+ese navegador siguen yendo al primario.
+"""
+import contextvars
+import random
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+STICKY_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def is_sticky(request):
+    """
+    True si el navegador escribió hace menos de REPLICA_STICKY_SECONDS.
+    """
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _replica_allowed(request):
+    return (bool(settings.DATABASE_REPLICAS) and request.method in SAFE_METHODS
+            and not is_sticky(request))
+
+
+def reading_from_replica():
+    """
+    True si las lecturas de este contexto van a una réplica. Lo que se lea
+    ahí puede ir detrás del primario y no se debe guardar en caches que
+    duren más que el retraso de replicación (ver tasks.taskcache).
+    """
+    return _use_replica.get() and bool(settings.DATABASE_REPLICAS)
+
+
+def read_from_replica(view):
+    """
+    Decorador de vistas: las lecturas de un GET van a una réplica, salvo que
+    el usuario haya escrito hace poco. Debe ir debajo de login_required, para
+    que la sesión y el usuario se sigan leyendo del primario.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _use_replica.set(_replica_allowed(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _use_replica.set(_replica_allowed(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Router de DATABASE_ROUTERS: lecturas marcadas a una réplica al azar,
+    todo lo demás a 'default'.
+    """
+
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        if _use_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        # Explícito: sin esto, guardar un objeto leído de una réplica
+        # escribiría en la réplica (Django usa la BBDD de la instancia)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        # Las réplicas tienen los mismos datos que el primario; fuera de ese
+        # grupo decide el comportamiento por defecto de Django
+        pool = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:  # pylint: disable=protected-access
+            return True
+        return None
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Después de una petición que escribe, fija la cookie que manda las
+    lecturas de ese navegador al primario por REPLICA_STICKY_SECONDS.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self._stick(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._stick(request, await self.get_response(request))
+
+    @staticmethod
+    def _stick(request, response):
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(STICKY_COOKIE, f'{time.time() + seconds:.3f}',
+                                max_age=seconds, httponly=True, samesite='Lax')
+        return response
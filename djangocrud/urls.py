@@ -14,24 +14,44 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from tasks import views
+from tasks import api, async_views, views
 from customerrors import views as error_views
 
+
+def task_urlpatterns(task_views):
+    """
+    Rutas de las vistas de tareas que tienen versión sync (tasks.views) y
+    async (tasks.async_views); ambas comparten rutas y nombres.
+    """
+    return [
+        path('tasks/list_tasks/', task_views.show_tasks, name='list_tasks'),
+        path('tasks/completed_tasks/', task_views.completed_tasks, name='completed_tasks'),
+        path('tasks/create/', task_views.create_task, name='create_task'),
+        path('tasks/<int:id_task>/', task_views.show_task_detail, name='task_detail'),
+        path('tasks/<int:id_task>/complete_task/',
+             task_views.complete_task, name='complete_task'),
+        path('tasks/<int:id_task>/remove_task/',
+             task_views.remove_task, name='remove_task'),
+    ]
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('tasks/signup/', views.signup, name='signup'),
-    path('tasks/list_tasks/', views.show_tasks, name='list_tasks'),
-    path('tasks/completed_tasks/', views.completed_tasks, name='completed_tasks'),
-    path('tasks/create/', views.create_task, name='create_task'),
-    path('tasks/<int:id_task>/', views.show_task_detail, name='task_detail'),
-    path('tasks/<int:id_task>/complete_task/',
-         views.complete_task, name='complete_task'),
-    path('tasks/<int:id_task>/remove_task/',
-         views.remove_task, name='remove_task'),
+    path('tasks/signup/check/', views.check_username, name='check_username'),
+    path('tasks/bulk/', views.bulk_tasks, name='bulk_tasks'),
+    path('tasks/export/', views.export_tasks, name='export_tasks'),
+    # Con TASKS_ASYNC_VIEWS=1 (despliegue con uvicorn) se montan las vistas async
+    *task_urlpatterns(async_views if settings.TASKS_ASYNC_VIEWS else views),
     path('logout/', views.close_session, name='logout'),
+    path('metrics/', views.show_metrics, name='metrics'),
+    path('api/tasks/', api.task_collection, name='api_tasks'),
+    path('api/tasks/<int:id_task>/', api.task_item, name='api_task'),
+    path('api/tasks/<int:id_task>/complete/', api.complete_task, name='api_task_complete'),
     path('tasks/signin/', views.CustomLoginView.as_view(), name='signin'),
     # as_view() Es obligatorio en CBV para que Django convierta la clase en una vista funcional.
 ]
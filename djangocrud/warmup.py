@@ -0,0 +1,138 @@
+"""
+Calentamiento del proceso al cargar la aplicación (djangocrud/wsgi.py y
+asgi.py), antes de atender la primera petición.
+
+Sin esto, la primera petición de cada worker paga:
+- poblar el resolver de URLs (y compilar sus regex, importar el admin),
+- leer y compilar las plantillas (y cargar sus templatetags),
+- importar el driver de la BBDD y abrir la primera conexión.
+
+run() lo hace una vez y después llama a gc.freeze(): los objetos creados
+hasta ahí quedan fuera del recolector. Con preload_app de gunicorn (ver
+gunicorn.conf.py) run() corre en el proceso maestro y los workers heredan
+todo por fork; al no recorrerlos el GC, las páginas de memoria no se
+copian y los workers las comparten (copy-on-write).
+
+La conexión a la BBDD se abre para verificarla y se cierra enseguida: un
+socket abierto en el maestro quedaría compartido por todos los workers.
+
+/readyz (djangocrud/middleware.py) responde 503 hasta que run() termina.
+Bajo ASGI run() corre al importar djangocrud/asgi.py, antes de que el
+worker acepte conexiones, así que ahí /readyz nunca ve ese estado.
+Con WARMUP=0 no se calienta nada y el proceso queda listo al cargar.
+"""
+import gc
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import NoReverseMatch, Resolver404, get_resolver, resolve, reverse
+
+from djangocrud.template_loaders import template_files
+
+logger = logging.getLogger('djangocrud.warmup')
+
+READY = threading.Event()
+
+
+def _url_names(resolver, namespace=''):
+    """
+    (nombre con namespace, parámetros) de cada ruta con nombre.
+    """
+    for name, entries in resolver.reverse_dict.lists():
+        if isinstance(name, str):
+            for possibilities, *_ in entries:
+                for _, params in possibilities:
+                    yield namespace + name, params
+    for prefix, (_, child) in resolver.namespace_dict.items():
+        yield from _url_names(child, f'{namespace}{prefix}:')
+
+
+def resolve_urls():
+    """
+    Invierte y resuelve cada nombre de URL; los parámetros valen '1'. Los
+    que no aceptan ese valor (p. ej. app_label del admin) se saltan: el
+    resolver ya quedó poblado. Devuelve cuántas rutas se resolvieron.
+    """
+    resolved = 0
+    for name, params in _url_names(get_resolver()):
+        try:
+            resolve(reverse(name, kwargs=dict.fromkeys(params, '1')))
+        except (NoReverseMatch, Resolver404):
+            continue
+        resolved += 1
+    return resolved
+
+
+def compile_templates():
+    """
+    Carga cada plantilla en cada backend; los cached loaders guardan la
+    versión compilada. Devuelve cuántas se compilaron.
+    """
+    compiled = 0
+    names = dict.fromkeys(name for name, _ in template_files())
+    for backend in engines.all():
+        for name in names:
+            try:
+                backend.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                logger.debug('warmup: %s no compila: %s', name, exc)
+                continue
+            compiled += 1
+    return compiled
+
+
+def connect_databases():
+    """
+    Abre y cierra una conexión por alias. Un error no impide arrancar:
+    /readyz lo reporta mientras la BBDD no responda.
+    """
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except DatabaseError as exc:
+            logger.warning('warmup: no se pudo conectar a %s: %s', connection.alias, exc)
+        connection.close()
+        if hasattr(connection, 'close_pool'):
+            # El pool de psycopg tiene hilos propios, que no sobreviven al fork
+            connection.close_pool()
+    return len(connections.all())
+
+
+def freeze():
+    """
+    Recolecta la basura del arranque y congela lo que sobrevive.
+    """
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+STAGES = {
+    'urls': resolve_urls,
+    'templates': compile_templates,
+    'databases': connect_databases,
+    'gc_frozen': freeze,
+}
+
+
+def run():
+    """
+    Corre cada etapa, loguea cuánto tardó y marca el proceso como listo.
+    """
+    if not settings.WARMUP:
+        READY.set()
+        return
+    started = time.perf_counter()
+    summary = {}
+    for stage, func in STAGES.items():
+        began = time.perf_counter()
+        summary[stage] = func()
+        summary[f'{stage}_ms'] = round((time.perf_counter() - began) * 1000, 1)
+    summary['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info('warmup %s', ' '.join(f'{key}={value}' for key, value in summary.items()),
+                extra={'warmup': summary})
+    READY.set()
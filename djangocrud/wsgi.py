@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangocrud.settings')
 
 application = get_wsgi_application()
+
+# Después de django.setup(): URLs, plantillas, BBDD y gc.freeze() (con
+# preload_app de gunicorn, una sola vez en el maestro)
+from djangocrud import warmup  # noqa: E402 pylint: disable=wrong-import-position
+
+warmup.run()
@@ -0,0 +1,20 @@
+"""
+Configuración de gunicorn. gunicorn la lee sola desde el directorio de
+trabajo, así que el comando de inicio en Render queda en:
+
+    gunicorn djangocrud.wsgi:application
+
+preload_app carga djangocrud/wsgi.py (y con él el warm-up de
+djangocrud/warmup.py) una vez en el maestro, antes del fork: los workers
+nacen con las URLs, las plantillas y los imports listos, y comparten esa
+memoria copy-on-write gracias a gc.freeze().
+
+Variables de entorno: PORT, WEB_CONCURRENCY (workers), GUNICORN_THREADS.
+Las opciones de la línea de comandos tienen prioridad sobre este archivo.
+"""
+import os
+
+bind = f'0.0.0.0:{os.environ.get("PORT", "8000")}'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
@@ -1,15 +1,92 @@
 """Importaciones de Modules
 """
 from django.contrib import admin
-from .models import Task
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from .models import PurgeJob, Task
+from . import purge, stats, taskcache
 
 
 class TaskAdmin(admin.ModelAdmin):
     """
     Con readonly_fields, estoy configurando que los campos automáticos sean visibles
     desde el Admin Site
+
+    list_select_related trae el usuario en el mismo SELECT del changelist; sin
+    él, Task.__str__ (self.user.username) hace una consulta por cada fila.
     """
     readonly_fields = ('created',)
+    list_display = ('title', 'user', 'created', 'datecompleted', 'important')
+    list_select_related = ('user',)
+
+    def get_queryset(self, request):
+        # La vista de cambio y la de borrado también muestran __str__
+        return super().get_queryset(request).select_related('user')
+
+    def save_model(self, request, obj, form, change):
+        """
+        Invalida el cache de listas del dueño (y del anterior si se reasignó)
+        """
+        super().save_model(request, obj, form, change)
+        previous = form.initial.get('user') if change else None
+        self._refresh(*{obj.user_id, previous} - {None})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._refresh(obj.user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
+        super().delete_queryset(request, queryset)
+        self._refresh(*user_ids)
+
+    @staticmethod
+    def _refresh(*user_ids):
+        """
+        Desde el admin se puede cambiar cualquier campo (incluso el dueño), así
+        que los contadores se recalculan en lugar de ajustarse.
+        """
+        for user_id in user_ids:
+            stats.rebuild(user_id)
+        taskcache.bump_version(*user_ids)
+
+
+class DeferredDeleteUserAdmin(UserAdmin):
+    """
+    Borrar un usuario desde el admin no lo borra en la petición: lo desactiva
+    y encola un PurgeJob (tasks.purge). La confirmación tampoco lista sus
+    tareas, que para un usuario con miles sería recorrerlas todas.
+    """
+
+    def delete_model(self, request, obj):
+        purge.request_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            purge.request_deletion(user)
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        # Como el admin de Django: quien no puede borrar tareas no puede
+        # borrar un usuario que se las lleva consigo
+        perms_needed = set()
+        if not request.user.has_perm('tasks.delete_task'):
+            perms_needed.add(Task._meta.verbose_name)  # pylint: disable=protected-access
+        return ([f'{obj} (sus tareas se borran en segundo plano)' for obj in objs],
+                {User._meta.verbose_name_plural: len(objs)},  # pylint: disable=protected-access
+                perms_needed, [])
+
+
+class PurgeJobAdmin(admin.ModelAdmin):
+    """
+    Estado de los borrados de usuarios en curso y terminados.
+    """
+    list_display = ('username', 'requested_at', 'heartbeat', 'finished_at', 'deleted', 'error')
+    readonly_fields = list_display + ('user_id',)
+
 
     # Register your models here.
 admin.site.register(Task, TaskAdmin)
+admin.site.register(PurgeJob, PurgeJobAdmin)
+admin.site.unregister(User)
+admin.site.register(User, DeferredDeleteUserAdmin)
@@ -0,0 +1,208 @@
+"""
+API JSON de tareas, limitada a las tareas de request.user.
+
+    GET    /api/tasks/?status=pending|completed&after=&before=   lista paginada
+    POST   /api/tasks/                                           crear
+    GET    /api/tasks/<id>/                                      detalle
+    PUT    /api/tasks/<id>/  (o PATCH para cambios parciales)    editar
+    DELETE /api/tasks/<id>/                                      borrar
+    POST   /api/tasks/<id>/complete/                             completar
+
+PUT y PATCH aceptan la "version" que devolvió el detalle: si la tarea
+cambió desde entonces responden 409 con la tarea actual ("current") en
+lugar de pisar el otro cambio. complete responde 409 si ya estaba
+completada.
+
+La lista y el detalle devuelven un ETag con la versión de tareas del usuario
+(tasks.taskcache). Un cliente que repite la petición con If-None-Match recibe
+304 sin que se consulte ni serialice ninguna tarea: el costo de un sondeo sin
+cambios es leer la fila TaskStats del usuario (una consulta por clave
+primaria, de donde sale la versión), sin ninguna consulta sobre Task.
+
+La autenticación es la sesión de Django, así que las peticiones que escriben
+deben enviar el header X-CSRFToken como cualquier formulario del sitio.
+"""
+import json
+from functools import wraps
+
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .models import Task
+from .pagination import KeysetPaginator
+from .taskform import TaskForm
+from .views import LIST_FIELDS, completed_paginator, page_cursors
+from . import stats, taskcache, writes
+
+# status -> (filtro, clave de orden, descendente). completed también incluye
+# las tareas archivadas (views.completed_paginator)
+LISTS = {
+    'pending': ({'datecompleted__isnull': True}, 'created', False),
+    'completed': ({'datecompleted__isnull': False}, 'datecompleted', True),
+}
+
+
+def api_login_required(view):
+    """
+    Como login_required, pero responde 401 en JSON en lugar de redirigir
+    a la página de login.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Autenticación requerida.'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def serialize(task):
+    """
+    Representación JSON de una tarea (modelo o dict de LIST_FIELDS). El
+    detalle incluye la versión, que PUT/PATCH deben devolver.
+    """
+    if isinstance(task, dict):
+        return dict(task)
+    data = {field: getattr(task, field) for field in LIST_FIELDS}
+    data['version'] = task.version
+    return data
+
+
+def _get_task(request, id_task):
+    return Task.objects.filter(pk=id_task, user=request.user).first()
+
+
+def _not_found():
+    return JsonResponse({'error': 'Tarea no encontrada.'}, status=404)
+
+
+def _etag(request):
+    return f'"{taskcache.for_request(request).version}"'
+
+
+def _conditional(request, etag, build):
+    """
+    Responde 304 si If-None-Match coincide con `etag`; si no, construye la
+    respuesta con build() y le agrega ETag y Cache-Control.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build()
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _conflict(request, id_task, error):
+    task = _get_task(request, id_task)
+    if task is None:
+        return _not_found()
+    return JsonResponse({'error': error, 'current': serialize(task)}, status=409)
+
+
+def _save_form(request, data, instance=None, status=200):
+    before = stats.state(instance) if instance else None
+    form = TaskForm(data, instance=instance)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+    if instance is not None:
+        # Edición: UPDATE de los campos cambiados condicionado a la versión
+        if not writes.update(instance, writes.changed_fields(form),
+                             form.submitted_version(), before):
+            return _conflict(request, instance.pk,
+                             'La tarea cambió desde que se leyó (version).')
+        return JsonResponse(serialize(instance), status=status)
+    task = form.save(commit=False)
+    task.user = request.user
+    with transaction.atomic():
+        task.save()
+        stats.record(request.user.pk, before, stats.state(task))
+    taskcache.bump_version(request.user.pk)
+    return JsonResponse(serialize(task), status=status)
+
+
+@api_login_required
+def task_collection(request):
+    """
+    GET lista paginada por cursor, POST crea una tarea.
+    """
+    if request.method == 'POST':
+        data = _json_body(request)
+        if data is None:
+            return JsonResponse({'error': 'JSON inválido.'}, status=400)
+        return _save_form(request, data, status=201)
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET', 'POST'])
+
+    status = request.GET.get('status', 'pending')
+    if status not in LISTS:
+        return JsonResponse({'error': 'status debe ser pending o completed.'}, status=400)
+
+    def build():
+        if status == 'completed':
+            paginator = completed_paginator(request.user)
+        else:
+            filters, key, descending = LISTS[status]
+            listtask = Task.objects.filter(user=request.user, **filters)
+            paginator = KeysetPaginator(listtask.values(*LIST_FIELDS), key, descending=descending)
+        after, before = page_cursors(request)
+        page = taskcache.get_or_build(
+            request, f'api:{status}:{after}:{before}',
+            lambda: paginator.page(after=after, before=before))
+        return JsonResponse({
+            'results': [serialize(task) for task in page.object_list],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+    return _conditional(request, _etag(request), build)
+
+
+@api_login_required
+def task_item(request, id_task):
+    """
+    GET detalle, PUT/PATCH edición, DELETE borrado.
+    """
+    if request.method == 'GET':
+        def build():
+            task = _get_task(request, id_task)
+            return JsonResponse(serialize(task)) if task else _not_found()
+        return _conditional(request, _etag(request), build)
+
+    task = _get_task(request, id_task)
+    if task is None:
+        return _not_found()
+    if request.method in ('PUT', 'PATCH'):
+        data = _json_body(request)
+        if data is None:
+            return JsonResponse({'error': 'JSON inválido.'}, status=400)
+        if request.method == 'PATCH':
+            data = {**{field: getattr(task, field) for field in TaskForm.Meta.fields},
+                    'version': task.version, **data}
+        return _save_form(request, data, instance=task)
+    if request.method == 'DELETE':
+        with transaction.atomic():
+            task.soft_delete()
+            stats.record(request.user.pk, before=stats.state(task))
+        taskcache.bump_version(request.user.pk)
+        return HttpResponse(status=204)
+    return HttpResponseNotAllowed(['GET', 'PUT', 'PATCH', 'DELETE'])
+
+
+@api_login_required
+def complete_task(request, id_task):
+    """
+    POST marca la tarea como completada.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    if not writes.complete(request.user.pk, id_task):
+        return _conflict(request, id_task, 'La tarea ya estaba completada.')
+    return JsonResponse(serialize(_get_task(request, id_task)))
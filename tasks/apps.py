@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # Conecta las señales que invalidan el usuario cacheado
+        from . import usercache  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+        # Gauges del pool de conexiones en /metrics/ (DB_POOL_MODE=pool)
+        from . import dbpool  # pylint: disable=import-outside-toplevel
+        dbpool.register_metrics()
@@ -0,0 +1,69 @@
+"""
+Archivado de tareas completadas antiguas en TaskArchive.
+
+archive_batch() mueve un lote en una transacción corta:
+    SELECT ... FOR UPDATE SKIP LOCKED   (las filas que nadie está editando)
+    INSERT INTO tasks_taskarchive ...
+    DELETE FROM tasks_task WHERE id IN (...)
+Los bloqueos duran lo que dura un lote, así que se puede correr con la
+aplicación en línea (manage.py archive_tasks).
+
+Las tareas archivadas siguen contando como completadas en TaskStats, por lo
+que moverlas no cambia los contadores.
+
+En PostgreSQL tasks_taskarchive está particionada por mes de datecompleted;
+ensure_partitions() crea las particiones que falten antes de insertar.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+from .models import Task, TaskArchive
+
+ARCHIVE_FIELDS = ('id', 'title', 'descripcion', 'created', 'datecompleted', 'important',
+                  'user_id')
+
+
+def _month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(start):
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def ensure_partitions(dates):
+    """
+    Crea (si no existen) las particiones mensuales que cubren `dates`.
+    No hace nada fuera de PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    table = TaskArchive._meta.db_table  # pylint: disable=protected-access
+    with connection.cursor() as cursor:
+        for start in sorted({_month_start(value) for value in dates}):
+            # Literales y no parámetros: el DDL no admite parámetros enlazados
+            # en el servidor (psycopg 3)
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_{start:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_next_month(start).isoformat()}')")
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Mueve a TaskArchive hasta `batch_size` tareas completadas antes de
+    `cutoff`. Devuelve (user_id afectados, tareas movidas); 0 si no quedan.
+    """
+    with transaction.atomic():
+        ids = list(Task.objects.filter(datecompleted__lt=cutoff)
+                   .order_by('datecompleted', 'id')
+                   .select_for_update(skip_locked=True)
+                   .values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return set(), 0
+        rows = list(Task.objects.filter(pk__in=ids).values(*ARCHIVE_FIELDS))
+        ensure_partitions(row['datecompleted'] for row in rows)
+        TaskArchive.objects.bulk_create([TaskArchive(**row) for row in rows])
+        Task.objects.filter(pk__in=ids).delete()
+    return {row['user_id'] for row in rows}, len(rows)
@@ -0,0 +1,173 @@
+"""
+Versiones async de las vistas de tareas para despliegues ASGI (uvicorn).
+
+Bajo ASGI cada vista sync pasa por sync_to_async y ocupa un hilo del pool
+mientras espera a la BBDD; estas vistas usan el ORM async (aget, acreate,
+asave, adelete, async for) y el cache async, así la concurrencia ya no queda
+limitada por el tamaño del pool de hilos.
+
+Se activan con TASKS_ASYNC_VIEWS=1: djangocrud/urls.py monta estas funciones
+en las mismas rutas y con los mismos nombres que las de tasks/views.py.
+Desde Django 5.1 login_required acepta vistas async (usa request.auser()).
+
+El ORM async no soporta transaction.atomic, así que la escritura y el ajuste
+de TaskStats van en sentencias separadas; si algo falla entre ambas,
+manage.py reconcile_task_stats corrige el desvío.
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from djangocrud.replicas import read_from_replica
+
+from .models import Task
+from .pagination import KeysetPage, KeysetPaginator
+from .taskform import TaskForm
+from .views import (LIST_FIELDS, completed_paginator, page_cursors, search_query,
+                    search_results)
+from . import stats, taskcache, writes
+
+
+async def _auser(request):
+    """
+    Carga el usuario de forma async y lo deja en request.user, para que el
+    context processor de auth no haga una consulta sync al renderizar.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def _render(request, template_name, context, status=200):
+    """
+    render() con los contadores de TaskStats y la versión de tareas
+    precargados: el context processor task_stats no puede consultar la BBDD
+    desde código async, y fragment_cache usa la versión.
+    """
+    await taskcache.afor_request(request)
+    return render(request, template_name, context, status=status)
+
+
+async def _aget_task_or_404(id_task, user):
+    try:
+        return await Task.objects.aget(pk=id_task, user=user)
+    except Task.DoesNotExist as exc:
+        raise Http404(id_task) from exc
+
+
+async def _render_list(request, status, listtask, paginator):
+    query = search_query(request)
+    if query:
+        page = KeysetPage([row async for row in search_results(listtask, query)])
+    else:
+        after, before = page_cursors(request)
+        page = await taskcache.aget_or_build(
+            request, f'{status.lower()}:{after}:{before}',
+            lambda: paginator.apage(after=after, before=before))
+    return await _render(request, 'tasks/tasks.html', {'tasks': page.object_list,
+                                                       'page': page,
+                                                       'query': query,
+                                                       'status': status})
+
+
+@login_required
+@read_from_replica
+async def show_tasks(request):
+    """
+    Versión async de views.show_tasks
+    """
+    user = await _auser(request)
+    listtask = Task.objects.filter(user=user, datecompleted__isnull=True)
+    return await _render_list(
+        request, 'Pending', listtask, KeysetPaginator(listtask.values(*LIST_FIELDS), 'created'))
+
+
+@login_required
+@read_from_replica
+async def completed_tasks(request):
+    """
+    Versión async de views.completed_tasks
+    """
+    user = await _auser(request)
+    listtask = Task.objects.filter(user=user, datecompleted__isnull=False)
+    return await _render_list(request, 'Completed', listtask, completed_paginator(user))
+
+
+@login_required
+async def create_task(request):
+    """
+    Versión async de views.create_task
+    """
+    user = await _auser(request)
+    if request.method == 'POST':
+        form = TaskForm(request.POST)
+        if form.is_valid():
+            task = await Task.objects.acreate(
+                user=user, **{field: form.cleaned_data[field] for field in TaskForm.Meta.fields})
+            await stats.arecord(user.pk, after=stats.state(task))
+            await taskcache.abump_version(user.pk)
+            messages.success(request, "✅ La tarea fue creada exitosamente.")
+            return redirect('list_tasks')
+        messages.error(request, "❌ El formulario tiene errores. Revisa los campos.")
+    else:
+        form = TaskForm()
+    return await _render(request, 'tasks/create_task.html', {'form': form})
+
+
+@login_required
+@read_from_replica
+async def show_task_detail(request, id_task):
+    """
+    Versión async de views.show_task_detail
+    """
+    user = await _auser(request)
+    filter_task = await _aget_task_or_404(id_task, user)
+    status = 200
+    if request.method == 'POST':
+        before = stats.state(filter_task)
+        form = TaskForm(request.POST, instance=filter_task)
+        if form.is_valid():
+            if await writes.aupdate(filter_task, writes.changed_fields(form),
+                                    form.submitted_version(), before):
+                messages.success(request, "✅ La tarea se actualizó exitosamente.")
+                return redirect('list_tasks')
+            # Conflicto: ver views.task_conflict
+            filter_task = await _aget_task_or_404(id_task, user)
+            form, status = TaskForm(instance=filter_task), 409
+            messages.error(request, "⚠️ La tarea cambió mientras la editabas. Revisa los "
+                                    "datos actuales y vuelve a guardar.")
+        else:
+            messages.error(request, "❌ El formulario tiene errores. Revisa los campos.")
+    else:
+        form = TaskForm(instance=filter_task)
+    return await _render(request, 'tasks/task_detail.html',
+                         {'form': form, 'filter_task': filter_task}, status=status)
+
+
+@login_required
+@require_POST
+async def complete_task(request, id_task):
+    """
+    Versión async de views.complete_task
+    """
+    user = await _auser(request)
+    if not await writes.acomplete(user.pk, id_task):
+        await _aget_task_or_404(id_task, user)
+        messages.info(request, "La tarea ya estaba completada.")
+    return redirect('list_tasks')
+
+
+@login_required
+async def remove_task(request, id_task):
+    """
+    Versión async de views.remove_task
+    """
+    user = await _auser(request)
+    filter_task = await _aget_task_or_404(id_task, user)
+    if request.method == 'POST':
+        await filter_task.asoft_delete()
+        await stats.arecord(user.pk, before=stats.state(filter_task))
+        await taskcache.abump_version(user.pk)
+    return redirect('list_tasks')
@@ -0,0 +1,217 @@
+"""
+Utilidades compartidas por los comandos bench_*: levantar gunicorn/uvicorn
+en un puerto local, generar carga HTTP concurrente y resumir latencias.
+
+Los servidores heredan el entorno del comando (DATABASE_URL, etc.), así que
+leen la misma BBDD donde el comando sembró los datos.
+"""
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+SERVERS = {
+    # Workers sync con hilos: el despliegue WSGI habitual
+    'gunicorn': lambda port, workers, threads: [
+        sys.executable, '-m', 'gunicorn', 'djangocrud.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--threads', str(threads), '--log-level', 'warning'],
+    'uvicorn': lambda port, workers, threads: [
+        sys.executable, '-m', 'uvicorn', 'djangocrud.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+        '--log-level', 'warning', '--no-access-log'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'El servidor terminó con código {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'El servidor no abrió el puerto {port} en {timeout}s')
+
+
+@contextmanager
+def run_server(kind, workers=2, threads=4, env=None):
+    """
+    Levanta gunicorn o uvicorn en un puerto libre y devuelve el puerto.
+    El servidor se detiene al salir del bloque.
+    """
+    port = free_port()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        SERVERS[kind](port, workers, threads),
+        cwd=settings.BASE_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port, process)
+        yield port
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def create_session(user):
+    """
+    Crea en la BBDD configurada una sesión autenticada de `user` (igual que
+    django.contrib.auth.login) y devuelve su session_key.
+    """
+    # pylint: disable=import-outside-toplevel
+    from importlib import import_module
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store[SESSION_KEY] = user._meta.pk.value_to_string(user)  # pylint: disable=protected-access
+    store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    store.create()
+    return store.session_key
+
+
+def session_cookie(user):
+    """
+    Inicia sesión de `user` en la BBDD configurada y devuelve el header Cookie.
+    """
+    return f'{settings.SESSION_COOKIE_NAME}={create_session(user)}'
+
+
+def csrf_headers(cookie=''):
+    """
+    Cookie y header CSRF válidos para peticiones POST contra un servidor real:
+    Django acepta como X-CSRFToken el mismo secreto de la cookie.
+    """
+    # pylint: disable=import-outside-toplevel
+    from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+    from django.utils.crypto import get_random_string
+    secret = get_random_string(CSRF_SECRET_LENGTH, allowed_chars=CSRF_ALLOWED_CHARS)
+    cookies = '; '.join(filter(None, [cookie, f'{settings.CSRF_COOKIE_NAME}={secret}']))
+    return {'Cookie': cookies, 'X-CSRFToken': secret,
+            'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+def client_load(requests, make_request):
+    """
+    Como http_load, pero en el mismo proceso con django.test.Client (sin
+    red ni servidor) y en serie.
+    """
+    from django.test import Client  # pylint: disable=import-outside-toplevel
+    client = Client(HTTP_HOST='localhost')
+    latencies = []
+    errors = []
+    start_all = time.perf_counter()
+    for i in range(requests):
+        method, path, body, headers = make_request(i)
+        headers = dict(headers)
+        content_type = headers.pop('Content-Type', 'application/x-www-form-urlencoded')
+        start = time.perf_counter()
+        response = client.generic(method, path, data=body or '',
+                                  content_type=content_type, headers=headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code < 400:
+            latencies.append(elapsed)
+        else:
+            errors.append(response.status_code)
+    return latencies, errors, time.perf_counter() - start_all
+
+
+def http_load(port, requests, concurrency, make_request):
+    """
+    Ejecuta `requests` peticiones repartidas en `concurrency` hilos, cada uno
+    con su conexión keep-alive. make_request(i) devuelve
+    (método, ruta, cuerpo, headers).
+
+    Devuelve (latencias en ms, errores, segundos totales).
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, path, body, headers = make_request(i)
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                status = repr(exc)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if isinstance(status, int) and status < 400:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(status)
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    """
+    Percentil por rango más cercano (pct entre 0 y 100).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors, seconds):
+    """
+    Resumen serializable a JSON de una corrida.
+    """
+    return {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'seconds': round(seconds, 3),
+        'rps': round(len(latencies) / seconds, 1) if seconds else None,
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+        'p50_ms': _round(percentile(latencies, 50)),
+        'p95_ms': _round(percentile(latencies, 95)),
+        'p99_ms': _round(percentile(latencies, 99)),
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
@@ -0,0 +1,120 @@
+"""
+Filtro de Bloom en memoria con los usernames existentes, para la consulta de
+disponibilidad del formulario de registro (views.check_username).
+
+Un filtro de Bloom responde "seguro que no está" o "quizá está". La mayoría
+de los nombres que se prueban al registrarse están libres, así que casi todas
+las respuestas salen del filtro sin consultar auth_user; solo un "quizá"
+(nombre tomado o falso positivo, ~USERNAME_BLOOM_ERROR_RATE) va a la BBDD.
+
+Cada proceso tiene su filtro y lo reconstruye desde auth_user cada
+USERNAME_BLOOM_REFRESH segundos. Los usuarios creados en este proceso se
+agregan al momento (add()); los de otros workers aparecen en la siguiente
+reconstrucción, hasta entonces el endpoint puede decir "disponible" para un
+nombre recién tomado. No es un problema: el alta se apoya en la restricción
+UNIQUE, no en esta respuesta.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from . import metrics
+
+NEGATIVES = 'username_bloom_negative_total'
+POSITIVES = 'username_bloom_positive_total'
+metrics.register(NEGATIVES, 'Usernames descartados por el filtro de Bloom (sin consulta).')
+metrics.register(POSITIVES, 'Usernames que el filtro de Bloom envió a la BBDD.')
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom para `capacity` elementos con tasa de falsos positivos
+    `error_rate`. Usa doble hashing sobre un blake2b de 128 bits.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(value))
+
+
+_lock = threading.Lock()
+_filter = None
+_built_at = 0.0
+
+
+def rebuild():
+    """
+    Construye un filtro nuevo con todos los usernames y lo publica.
+    """
+    global _filter, _built_at  # pylint: disable=global-statement
+    usernames = User.objects.values_list('username', flat=True).order_by()
+    # Margen para los usuarios que se creen hasta la próxima reconstrucción
+    bloom = BloomFilter(max(2 * usernames.count(), 1000), settings.USERNAME_BLOOM_ERROR_RATE)
+    for username in usernames.iterator(chunk_size=5000):
+        bloom.add(username)
+    _filter, _built_at = bloom, time.monotonic()
+    return bloom
+
+
+def _current():
+    """
+    Filtro vigente. Si venció lo reconstruye un solo hilo; los demás siguen
+    usando el anterior mientras tanto.
+    """
+    bloom = _filter
+    if bloom is not None and time.monotonic() - _built_at < settings.USERNAME_BLOOM_REFRESH:
+        return bloom
+    if bloom is None:
+        with _lock:
+            return _filter if _filter is not None else rebuild()
+    if _lock.acquire(blocking=False):
+        try:
+            return rebuild()
+        finally:
+            _lock.release()
+    return bloom
+
+
+def might_exist(username):
+    """
+    False si el username seguro no existe; True si puede existir.
+    """
+    found = username in _current()
+    metrics.incr(POSITIVES if found else NEGATIVES)
+    return found
+
+
+def add(username):
+    """
+    Agrega un username recién creado al filtro de este proceso.
+    """
+    if _filter is not None:
+        _filter.add(username)
+
+
+def clear():
+    """
+    Descarta el filtro (la próxima consulta lo reconstruye).
+    """
+    global _filter  # pylint: disable=global-statement
+    _filter = None
@@ -0,0 +1,79 @@
+"""
+Operaciones masivas sobre las tareas de un usuario.
+
+Cada acción se resuelve con sentencias UPDATE filtradas por dueño (el
+borrado también: marca deleted_at, ver tasks.purge):
+    UPDATE tasks_task SET ... WHERE user_id = %s AND id IN (...)
+en lugar de un SELECT + save()/delete() + redirect por tarea. Los
+contadores de TaskStats se ajustan en la misma transacción.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Task
+from . import stats, taskcache
+
+# acción -> texto para el mensaje de resultado
+ACTIONS = {
+    'complete': 'completadas',
+    'toggle_important': 'actualizadas',
+    'delete': 'eliminadas',
+}
+
+# Tope de ids por petición, para acotar el tamaño del IN (...)
+MAX_IDS = 1000
+
+
+def parse_ids(values):
+    """
+    Convierte los ids recibidos del formulario en enteros, descartando
+    valores inválidos y duplicados.
+    """
+    return sorted({int(value) for value in values if value.isdecimal()})[:MAX_IDS]
+
+
+def apply(user, action, ids):
+    """
+    Aplica `action` a las tareas `ids` del usuario y devuelve cuántas filas
+    se vieron afectadas. Las tareas de otros usuarios se ignoran.
+    """
+    if action not in ACTIONS:
+        raise ValueError(action)
+    if not ids:
+        return 0
+    tasks = Task.objects.filter(user=user, pk__in=ids)
+    with transaction.atomic():
+        if action == 'complete':
+            # Dos UPDATE (importantes y no importantes) para saber cuánto
+            # restar al contador de importantes sin leer las filas.
+            pending = tasks.filter(datecompleted__isnull=True)
+            now = timezone.now()
+            changed = {'datecompleted': now, 'version': F('version') + 1}
+            important = pending.filter(important=True).update(**changed)
+            affected = important + pending.filter(important=False).update(**changed)
+            changes = {'pending': -affected, 'completed': affected, 'important': -important}
+        else:
+            # Estado previo de las filas, bloqueadas (SELECT ... FOR UPDATE en
+            # PostgreSQL) para que el ajuste de contadores sea exacto. Son a
+            # lo sumo MAX_IDS filas de dos columnas.
+            counts = dict.fromkeys(stats.FIELDS, 0)
+            for datecompleted, important in tasks.select_for_update().values_list(
+                    'datecompleted', 'important'):
+                for field, value in stats.deltas(
+                        after=(datecompleted is None, important)).items():
+                    counts[field] += value
+            if action == 'toggle_important':
+                affected = tasks.update(important=Case(
+                    When(important=True, then=Value(False)), default=Value(True)),
+                    version=F('version') + 1)
+                unmarked = counts['pending'] - counts['important']
+                changes = {'important': unmarked - counts['important']}
+            else:
+                # Borrado lógico; el DELETE lo hace manage.py purge_worker
+                affected = tasks.update(deleted_at=timezone.now())
+                changes = {field: -value for field, value in counts.items()}
+        stats.adjust(user.pk, **changes)
+    if affected:
+        taskcache.bump_version(user.pk)
+    return affected
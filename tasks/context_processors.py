@@ -0,0 +1,41 @@
+"""
+Context processors de la app tasks.
+"""
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from . import taskcache
+
+
+def task_stats(request):
+    """
+    Contadores del usuario para los badges de tasks/base.html.
+
+    Es perezoso: solo se consulta si la plantilla usa task_stats. Es la misma
+    fila de TaskStats que trae la versión de tasks.taskcache, leída una vez
+    por petición. Las vistas async la dejan precargada en request.task_stats.
+    """
+    def load():
+        if not request.user.is_authenticated:
+            return None
+        return taskcache.for_request(request)
+    return {'task_stats': SimpleLazyObject(load)}
+
+
+def fragment_cache(request):
+    """
+    Clave y duración para los {% cache %} de tasks/base.html.
+
+    navbar_key identifica lo que muestra la barra de navegación: una sola
+    variante para todos los anónimos y, para cada usuario, su nombre y la
+    versión de sus tareas (tasks.taskcache), que cambia con cada escritura y
+    con ella los badges. Es perezosa como task_stats y sale de la misma fila.
+    """
+    def key():
+        user = request.user
+        if not user.is_authenticated:
+            return 'anon'
+        version = taskcache.for_request(request).version
+        return f'{user.pk}:{user.get_username()}:{version}'
+    return {'navbar_key': SimpleLazyObject(key),
+            'fragment_timeout': settings.TEMPLATE_FRAGMENT_TIMEOUT}
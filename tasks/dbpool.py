@@ -0,0 +1,70 @@
+"""
+Estadísticas del pool de conexiones de psycopg 3 (DB_POOL_MODE=pool, ver
+settings.py) expuestas en /metrics/.
+
+Por cada alias con pool se registran los gauges db_pool_<alias>_*:
+    connections   conexiones abiertas por el pool
+    in_use        conexiones prestadas a una petición
+    waiting       peticiones esperando una conexión libre
+    wait_seconds  tiempo total esperado por una conexión (acumulado)
+    timeouts      peticiones que no consiguieron conexión en DB_POOL_TIMEOUT
+
+El pool es por proceso: con varios workers de gunicorn cada scrape ve el
+del worker que lo atendió. Si el pool todavía no se abrió (ninguna petición
+usó ese alias) los gauges no aparecen.
+"""
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+# gauge -> (descripción, valor a partir de get_stats() de psycopg_pool)
+GAUGES = {
+    'connections': ('Conexiones abiertas por el pool.',
+                    lambda stats: stats['pool_size']),
+    'in_use': ('Conexiones del pool prestadas a una petición.',
+               lambda stats: stats['pool_size'] - stats['pool_available']),
+    'waiting': ('Peticiones esperando una conexión libre del pool.',
+                lambda stats: stats['requests_waiting']),
+    'wait_seconds': ('Segundos esperados por una conexión del pool (acumulado).',
+                     lambda stats: stats.get('requests_wait_ms', 0) / 1000),
+    'timeouts': ('Peticiones que no consiguieron conexión del pool a tiempo.',
+                 lambda stats: stats.get('requests_errors', 0)),
+}
+
+
+def pooled_aliases():
+    """
+    Alias de DATABASES configurados con pool.
+    """
+    return [alias for alias, database in settings.DATABASES.items()
+            if database.get('OPTIONS', {}).get('pool')]
+
+
+def stats(alias):
+    """
+    get_stats() del pool de `alias`, o None si no tiene pool o todavía no se
+    abrió. No lo abre: connections[alias].pool crearía las conexiones.
+    """
+    # Django guarda los pools por alias en la clase del backend
+    pools = getattr(type(connections[alias]), '_connection_pools', {})
+    pool = pools.get(alias)
+    return pool.get_stats() if pool is not None else None
+
+
+def _gauge(alias, func):
+    def current():
+        pool_stats = stats(alias)
+        return None if pool_stats is None else func(pool_stats)
+    return current
+
+
+def register_metrics():
+    """
+    Registra los gauges de cada alias con pool. Se llama desde
+    TasksConfig.ready().
+    """
+    for alias in pooled_aliases():
+        for name, (description, func) in GAUGES.items():
+            metrics.register_gauge(f'db_pool_{alias}_{name}', f'{description} ({alias})',
+                                   _gauge(alias, func))
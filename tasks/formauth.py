@@ -4,6 +4,9 @@ Importamos las librerías que se usaremos
 from django import forms
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from . import bloom
 
 
 class RegistroForm(forms.ModelForm):
@@ -51,20 +54,19 @@ class RegistroForm(forms.ModelForm):
         # ligados al modelo User
         fields = ['username', 'email']
 
-    def clean_username(self):
+    def validate_unique(self):
         """
-        Sobreescribimos el metodo clean_username para validar si el usuario existe en BBDD
-        En Django, cualquier método con el nombre clean_<campo> sirve para validar un campo e
-        specífico de un formulario.
-
-        self.cleaned_data es un diccionario que contiene los valores del formulario después 
-        de pasar las validaciones básicas (tipos de datos, campos requeridos, etc.).
-        Aquí se extrae el valor que el usuario escribió en el campo username.
+        ModelForm comprueba aquí los campos únicos del modelo con un SELECT por
+        campo. Para username no se hace: la restricción UNIQUE de auth_user lo
+        garantiza en el INSERT (ver save()), sin la consulta previa y sin la
+        carrera entre dos altas simultáneas con el mismo nombre.
         """
-        username = self.cleaned_data['username']
-        if User.objects.filter(username=username).exists():
-            raise ValidationError(f'Username << {username} >> already exists!')
-        return username
+        exclude = self._get_validation_exclusions()
+        exclude.add('username')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
 
     def clean(self):
         """
@@ -121,9 +123,20 @@ class RegistroForm(forms.ModelForm):
         Retorna la instancia del User.
         Así el código que llama al formulario puede seguir trabajando con el usuario
         creado (guardado o no, según commit).
+
+        Si el username ya existe, el INSERT viola la restricción UNIQUE: el
+        IntegrityError se convierte en el error del campo username y se
+        retorna None. El atomic() deja la transacción usable después del error.
         """
         user = super().save(commit=False)
         user.set_password(self.cleaned_data["password1"])
         if commit:
-            user.save()
+            try:
+                with transaction.atomic():
+                    user.save()
+            except IntegrityError:
+                self.add_error('username', ValidationError(
+                    f'Username << {user.username} >> already exists!', code='unique'))
+                return None
+            bloom.add(user.username)
         return user
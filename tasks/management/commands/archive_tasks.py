@@ -0,0 +1,58 @@
+"""
+Comando archive_tasks
+
+Mueve a TaskArchive las tareas completadas hace más de --older-than días, en
+lotes de --batch-size con una transacción corta por lote (ver tasks.archive).
+--sleep agrega una pausa entre lotes para no competir con el tráfico.
+
+Uso:
+    python manage.py archive_tasks --older-than 90 --batch-size 1000 --sleep 0.1
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks import archive, taskcache
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Archivado por lotes de tareas completadas antiguas.
+    """
+    help = 'Mueve las tareas completadas antiguas a TaskArchive.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, metavar='DAYS',
+                            help='Archiva las completadas hace más de DAYS días.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Segundos de pausa entre lotes.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo cuenta las tareas que se archivarían.')
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 0 or options['batch_size'] < 1:
+            raise CommandError('--older-than debe ser >= 0 y --batch-size >= 1.')
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        if options['dry_run']:
+            count = Task.objects.filter(datecompleted__lt=cutoff).count()
+            self.stdout.write(f'{count} tareas completadas antes de {cutoff:%Y-%m-%d %H:%M}.')
+            return
+
+        moved = batches = 0
+        while True:
+            user_ids, count = archive.archive_batch(cutoff, options['batch_size'])
+            if not count:
+                break
+            # Las páginas cacheadas aún muestran esas tareas como editables
+            taskcache.bump_version(*user_ids)
+            moved += count
+            batches += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f'lote {batches}: {count} tareas')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'{moved} tareas archivadas en {batches} lotes.'))
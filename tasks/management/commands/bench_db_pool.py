@@ -0,0 +1,198 @@
+"""
+Comando bench_db_pool
+
+Compara los modos de conexión a PostgreSQL (DB_POOL_MODE, ver settings.py)
+sirviendo la lista de tareas con gunicorn (o uvicorn) real:
+
+    persistent  una conexión por hilo, reutilizada DB_CONN_MAX_AGE segundos
+    per_request persistent con DB_CONN_MAX_AGE=0: conexión nueva por petición
+    pool        pool de psycopg 3 por worker (DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE)
+
+Por cada modo informa throughput y latencias p50/p95/p99, las conexiones
+que el servidor abrió en PostgreSQL durante la carga (churn, de
+pg_stat_database.sessions, PostgreSQL >= 14), el máximo de conexiones
+simultáneas y las que quedaron abiertas ociosas al terminar (muestreando
+pg_stat_activity), y en modo pool las estadísticas de /metrics/ de uno de
+los workers.
+
+Solo corre contra PostgreSQL: DATABASE_URL debe apuntar a una BBDD local.
+
+Uso:
+    python manage.py bench_db_pool --requests 2000 --concurrency 32 --workers 2 --threads 8
+"""
+import http.client
+import json
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from tasks import benchmarking
+from tasks.models import Task
+
+BENCH_USERNAME = 'bench_db_pool'
+MODES = {
+    'persistent': {'DB_POOL_MODE': 'persistent'},
+    'per_request': {'DB_POOL_MODE': 'persistent', 'DB_CONN_MAX_AGE': '0'},
+    'pool': {'DB_POOL_MODE': 'pool'},
+}
+
+
+class ActivityMonitor:
+    """
+    Muestrea en un hilo las conexiones a la BBDD (sin contar la propia) y
+    guarda el máximo.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        # Hilo propio -> conexión propia de Django
+        try:
+            while not self._stop.is_set():
+                self.peak = max(self.peak, server_connections())
+                self._stop.wait(self.interval)
+        finally:
+            connections['default'].close()
+
+
+def server_connections():
+    """
+    Conexiones abiertas a la BBDD actual, sin contar la de este hilo.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM pg_stat_activity '
+                       'WHERE datname = current_database() AND pid <> pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+def sessions_opened():
+    """
+    Sesiones abiertas en la BBDD actual desde el último reset de estadísticas
+    (None antes de PostgreSQL 14).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('server_version_num')::int >= 140000")
+        if not cursor.fetchone()[0]:
+            return None
+        cursor.execute('SELECT sessions FROM pg_stat_database WHERE datname = current_database()')
+        return cursor.fetchone()[0]
+
+
+def pool_metrics(port, token):
+    """
+    Gauges db_pool_* de /metrics/ del worker que atienda la petición.
+    """
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        conn.request('GET', reverse('metrics'), headers={'Authorization': f'Bearer {token}'})
+        body = conn.getresponse().read().decode()
+    finally:
+        conn.close()
+    return {name: float(current) for name, current in (
+        line.split() for line in body.splitlines()
+        if line.startswith('db_pool_') and not line.startswith('#'))}
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de los modos de conexión a PostgreSQL.
+    """
+    help = 'Compara conexiones persistentes, por petición y pool de psycopg 3.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--server', choices=sorted(benchmarking.SERVERS),
+                            default='gunicorn')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Hilos por worker de gunicorn.')
+        parser.add_argument('--pool-min-size', type=int, default=2)
+        parser.add_argument('--pool-max-size', type=int, default=4)
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+        parser.add_argument('--tasks', type=int, default=100,
+                            help='Tareas pendientes del usuario de prueba.')
+        parser.add_argument('--json', action='store_true',
+                            help='Imprime el resultado como JSON.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('bench_db_pool necesita PostgreSQL (DATABASE_URL).')
+
+        User.objects.filter(username=BENCH_USERNAME).delete()
+        user = User.objects.create(username=BENCH_USERNAME)
+        Task.objects.bulk_create(
+            [Task(title=f'Tarea {n}', descripcion='benchmark', user=user)
+             for n in range(options['tasks'])])
+        headers = {'Cookie': benchmarking.session_cookie(user)}
+        path = reverse('list_tasks')
+        token = get_random_string(32)
+
+        results = {}
+        try:
+            for mode in options['modes']:
+                env = {**MODES[mode], 'METRICS_TOKEN': token,
+                       'DB_POOL_MIN_SIZE': str(options['pool_min_size']),
+                       'DB_POOL_MAX_SIZE': str(options['pool_max_size']),
+                       'TASKS_ASYNC_VIEWS': '1' if options['server'] == 'uvicorn' else '0'}
+                results[mode] = self._run(options, env, path, headers, token)
+                self.stderr.write(f'[{mode}] p50 {results[mode]["p50_ms"]} ms, '
+                                  f'{results[mode]["connections_opened"]} conexiones abiertas')
+        finally:
+            User.objects.filter(username=BENCH_USERNAME).delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"modo":<12}{"req/s":>9}{"p50 ms":>9}{"p99 ms":>9}'
+                          f'{"abiertas":>10}{"máximo":>8}{"ociosas":>9}{"errores":>9}')
+        # Si todas las peticiones fallaron, summarize() deja None en las latencias
+        for mode, summary in results.items():
+            self.stdout.write(
+                f'{mode:<12}{summary["rps"]!s:>9}{summary["p50_ms"]!s:>9}{summary["p99_ms"]!s:>9}'
+                f'{summary["connections_opened"]!s:>10}{summary["peak_connections"]:>8}'
+                f'{summary["idle_after"]:>9}{summary["errors"]:>9}')
+
+    @staticmethod
+    def _run(options, env, path, headers, token):
+        with benchmarking.run_server(options['server'], options['workers'],
+                                     options['threads'], env) as port:
+            def make_request(i):  # pylint: disable=unused-argument
+                return ('GET', path, None, headers)
+
+            # Calentamiento: plantillas y cache; las conexiones se cuentan
+            # desde aquí para incluir las que abra el servidor bajo carga
+            benchmarking.http_load(port, options['concurrency'], options['concurrency'],
+                                   make_request)
+            before = sessions_opened()
+            with ActivityMonitor() as monitor:
+                summary = benchmarking.summarize(*benchmarking.http_load(
+                    port, options['requests'], options['concurrency'], make_request))
+            # PostgreSQL publica sus estadísticas cada ~0.5 s
+            time.sleep(1)
+            after = sessions_opened()
+            # El monitor abrió y cerró una sesión propia
+            summary['connections_opened'] = (None if before is None
+                                             else max(0, after - before - 1))
+            summary['peak_connections'] = monitor.peak
+            summary['idle_after'] = server_connections()
+            if env['DB_POOL_MODE'] == 'pool':
+                summary['pool'] = pool_metrics(port, token)
+        return summary
@@ -0,0 +1,169 @@
+"""
+Comando bench_logging
+
+Compara la latencia de task_detail GET y complete_task POST (django.test.Client,
+en el mismo proceso) con distintas configuraciones de logging, todas con el
+SQL de django.db.backends activo como en desarrollo (DEBUG=True):
+
+    sync            la configuración anterior: StreamHandler síncrono en DEBUG
+                    sobre el raíz y sobre "django" (cada línea sale dos veces)
+    queue           settings.LOGGING (QueueHandler + QueueListener), sin muestreo
+    queue+sampled   igual, con el SQL limitado a --sql-rate líneas por segundo
+    queue+json      igual que queue+sampled, con JsonFormatter
+
+Los logs se escriben en un archivo temporal; --sink-delay-ms agrega una espera
+por escritura para simular un stdout lento (pipe hacia un colector saturado).
+
+Uso:
+    python manage.py bench_logging --requests 300 --sink-delay-ms 0.2 -o logging.json
+"""
+import copy
+import json
+import logging
+import logging.config
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+
+from tasks import benchmarking
+from tasks.models import Task
+
+BENCH_USER = 'bench_logging'
+
+
+class Sink:
+    """
+    Stream de destino: cuenta las líneas y opcionalmente espera en cada write.
+    """
+
+    def __init__(self, handle, delay):
+        self.handle = handle
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        self.lines += text.count('\n')
+        return self.handle.write(text)
+
+    def flush(self):
+        self.handle.flush()
+
+
+def configs(sink, sql_rate):
+    """
+    nombre -> diccionario para logging.config.dictConfig.
+    """
+    sync = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {
+            'console': {'level': 'DEBUG', 'class': 'logging.StreamHandler', 'stream': sink},
+        },
+        'root': {'handlers': ['console'], 'level': 'DEBUG'},
+        'loggers': {
+            'django': {'handlers': ['console'], 'level': 'DEBUG', 'propagate': True},
+            'django.db.backends': {'level': 'NOTSET'},
+        },
+    }
+
+    def queued(rate, formatter='text'):
+        config = copy.deepcopy(settings.LOGGING)
+        config['handlers']['queue'].update(stream=sink, formatter=formatter)
+        config['filters']['sql_sample']['rate'] = rate
+        config['root']['level'] = 'DEBUG'
+        config['loggers']['django.db.backends']['level'] = 'DEBUG'
+        return config
+
+    return {
+        'sync': sync,
+        'queue': queued(-1),
+        'queue+sampled': queued(sql_rate),
+        'queue+json': queued(sql_rate, 'json'),
+    }
+
+
+def _configure(config):
+    # dictConfig agrega filtros a los loggers existentes pero no quita los
+    # de la configuración anterior
+    logging.getLogger('django.db.backends').filters.clear()
+    logging.config.dictConfig(config)
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de las configuraciones de logging.
+    """
+    help = 'Compara la latencia de las peticiones con logging síncrono y con cola.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Peticiones por ruta.')
+        parser.add_argument('--tasks', type=int, default=200)
+        parser.add_argument('--sql-rate', type=float, default=10,
+                            help='Líneas de SQL por segundo en las variantes sampled.')
+        parser.add_argument('--sink-delay-ms', type=float, default=0.0,
+                            help='Espera por escritura en el destino de los logs.')
+        parser.add_argument('--output', '-o', help='Archivo JSON (por defecto stdout).')
+
+    def handle(self, *args, **options):
+        User.objects.filter(username=BENCH_USER).delete()
+        user = User.objects.create_user(BENCH_USER)
+        Task.objects.bulk_create(
+            [Task(title=f'Tarea {n}', descripcion='benchmark', user=user)
+             for n in range(options['tasks'])])
+        cookie = benchmarking.session_cookie(user)
+        detail_id = Task.objects.filter(user=user).values_list('id', flat=True).first()
+        requests = options['requests']
+
+        results = {}
+        debug_cursor = connection.force_debug_cursor
+        try:
+            with tempfile.TemporaryFile('w+', encoding='utf-8') as handle:
+                sink = Sink(handle, options['sink_delay_ms'] / 1000)
+                for name, config in configs(sink, options['sql_rate']).items():
+                    results[name] = self._run(name, config, sink, user, cookie,
+                                              detail_id, requests)
+        finally:
+            _configure(settings.LOGGING)
+            connection.force_debug_cursor = debug_cursor
+            User.objects.filter(username=BENCH_USER).delete()
+
+        output = json.dumps({'options': {key: options[key] for key in (
+            'requests', 'tasks', 'sql_rate', 'sink_delay_ms')}, 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f'Resultados en {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def _run(self, name, config, sink, user, cookie, detail_id, requests):
+        # pylint: disable=too-many-arguments
+        _configure(config)
+        connection.force_debug_cursor = True
+        pool = [task.pk for task in Task.objects.bulk_create(
+            [Task(title=f'Completar {i}', user=user) for i in range(requests)])]
+        routes = {
+            'task_detail GET': lambda i: (
+                'GET', reverse('task_detail', args=[detail_id]), None, {'Cookie': cookie}),
+            'complete_task POST': lambda i: (
+                'POST', reverse('complete_task', args=[pool[i]]), '',
+                benchmarking.csrf_headers(cookie)),
+        }
+        results = {}
+        for route, make in routes.items():
+            lines = sink.lines
+            summary = benchmarking.summarize(*benchmarking.client_load(requests, make))
+            for handler in logging.getLogger().handlers:
+                handler.flush()
+            summary['log_lines'] = sink.lines - lines
+            results[route] = summary
+            self.stderr.write(f'[{name}] {route}: p50 {summary["p50_ms"]} ms, '
+                              f'p99 {summary["p99_ms"]} ms, {summary["log_lines"]} líneas')
+        return results
@@ -0,0 +1,238 @@
+"""
+Comando bench_routes
+
+Siembra N usuarios x M tareas (mezcla de pendientes, completadas e
+importantes) y mide cada ruta de djangocrud/urls.py (menos el admin):
+- en el mismo proceso con django.test.Client ("client"),
+- contra gunicorn (WSGI) y uvicorn (ASGI, vistas async) reales en localhost.
+
+El resultado es JSON con throughput y latencias p50/p95/p99 por ruta, para
+comparar corridas entre commits:
+    python manage.py bench_routes --users 10 --tasks 500 --requests 200 -o bench.json
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import benchmarking
+from tasks.models import Task
+
+BENCH_PREFIX = 'bench_routes_'
+BENCH_PASSWORD = 'bench-password-123'
+TARGETS = ('client', 'gunicorn', 'uvicorn')
+# signin POST manda X-Forwarded-For (ver bench_ip) y el throttle lo usa
+THROTTLE_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+
+
+class Dataset:
+    """
+    Usuarios, sesiones y tareas sembradas para el benchmark.
+
+    complete_task, remove_task y logout consumen recursos (cada petición
+    necesita una tarea pendiente o una sesión distinta), así que antes de
+    cada objetivo se crean pools nuevos con pools().
+    """
+
+    def __init__(self, users, tasks, requests):
+        self.requests = requests
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        password = User(username='x')
+        password.set_password(BENCH_PASSWORD)
+        # Un solo hash PBKDF2 para todos los usuarios sembrados
+        self.users = User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{n}', password=password.password)
+            for n in range(users)])
+        now = timezone.now()
+        Task.objects.bulk_create([
+            Task(title=f'Tarea {n}', descripcion='benchmark ' * 5, user=user,
+                 important=n % 10 == 0,
+                 datecompleted=now - timedelta(minutes=n) if n % 10 < 3 else None)
+            for user in self.users for n in range(tasks)], batch_size=2000)
+        # user_id -> cookie de sesión
+        self.sessions = {user.pk: benchmarking.session_cookie(user) for user in self.users}
+        self.detail_ids = [
+            Task.objects.filter(user=user, datecompleted__isnull=True).values_list(
+                'id', flat=True).first() for user in self.users]
+
+    def pools(self):
+        """
+        Pools de tareas para complete/remove y sesiones para logout.
+        """
+        return {
+            'complete': self._sacrificial('complete'),
+            'remove': self._sacrificial('remove'),
+            'logout': [benchmarking.session_cookie(self.users[i % len(self.users)])
+                       for i in range(self.requests)],
+        }
+
+    def _sacrificial(self, label):
+        tasks = Task.objects.bulk_create([
+            Task(title=f'{label} {i}', descripcion='benchmark',
+                 user=self.users[i % len(self.users)])
+            for i in range(self.requests)], batch_size=2000)
+        return [(task.user_id, task.pk) for task in tasks]
+
+    def session_for(self, i):
+        return self.sessions[self.users[i % len(self.users)].pk]
+
+    def cleanup(self):
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        Session.objects.filter(session_key__in=[
+            cookie.split('=', 1)[1] for cookie in self.sessions.values()]).delete()
+
+
+def bench_ip(i):
+    """
+    IP distinta por petición, en 10.0.0.0/8.
+    """
+    return f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}'
+
+
+def routes(data, pools):
+    """
+    route -> make_request(i) -> (método, ruta, cuerpo, headers). pools es el
+    resultado de Dataset.pools().
+    """
+    complete_pool, remove_pool = pools['complete'], pools['remove']
+    def get(path_factory, cookie=True):
+        def make(i):
+            return ('GET', path_factory(i), None,
+                    {'Cookie': data.session_for(i)} if cookie else {})
+        return make
+
+    def post(path_factory, body_factory=lambda i: {}, cookie_factory=None,
+             headers_factory=lambda i: {}):
+        def make(i):
+            cookie = (cookie_factory or data.session_for)(i)
+            return ('POST', path_factory(i), urlencode(body_factory(i), doseq=True),
+                    {**benchmarking.csrf_headers(cookie), **headers_factory(i)})
+        return make
+
+    def detail(i):
+        return reverse('task_detail', args=[data.detail_ids[i % len(data.users)]])
+
+    return {
+        'home': get(lambda i: reverse('home'), cookie=False),
+        'signup GET': get(lambda i: reverse('signup'), cookie=False),
+        'signin GET': get(lambda i: reverse('signin'), cookie=False),
+        'signin POST': post(
+            lambda i: reverse('signin'),
+            lambda i: {'username': data.users[i % len(data.users)].username,
+                       'password': BENCH_PASSWORD},
+            cookie_factory=lambda i: '',
+            # Una IP por intento: con una sola, tasks.throttle rechaza con 429
+            # después de la ráfaga y se mediría el rechazo, no el login
+            headers_factory=lambda i: {'X-Forwarded-For': bench_ip(i)}),
+        'list_tasks': get(lambda i: reverse('list_tasks')),
+        'completed_tasks': get(lambda i: reverse('completed_tasks')),
+        'create GET': get(lambda i: reverse('create_task')),
+        'create POST': post(lambda i: reverse('create_task'),
+                            lambda i: {'title': f'Nueva {i}', 'descripcion': 'benchmark'}),
+        'task_detail GET': get(detail),
+        'task_detail POST': post(detail, lambda i: {
+            'title': f'Editada {i}', 'descripcion': 'benchmark', 'important': 'on'}),
+        'bulk_tasks POST': post(lambda i: reverse('bulk_tasks'), lambda i: {
+            'action': 'toggle_important', 'ids': data.detail_ids}),
+        'complete_task POST': post(
+            lambda i: reverse('complete_task', args=[complete_pool[i][1]]),
+            cookie_factory=lambda i: data.sessions[complete_pool[i][0]]),
+        'remove_task POST': post(
+            lambda i: reverse('remove_task', args=[remove_pool[i][1]]),
+            cookie_factory=lambda i: data.sessions[remove_pool[i][0]]),
+        'export_tasks': get(lambda i: reverse('export_tasks')),
+        'api_tasks GET': get(lambda i: reverse('api_tasks')),
+        'api_task GET': get(lambda i: reverse(
+            'api_task', args=[data.detail_ids[i % len(data.users)]])),
+        'logout': lambda i: ('GET', reverse('logout'), None,
+                             {'Cookie': pools['logout'][i]}),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, check=False).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de carga de todas las rutas.
+    """
+    help = 'Mide throughput y latencias de cada ruta (test client, gunicorn, uvicorn).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--tasks', type=int, default=200, help='Tareas por usuario.')
+        parser.add_argument('--requests', type=int, default=100, help='Peticiones por ruta.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--targets', default=','.join(TARGETS),
+                            help=f'Lista separada por comas de {", ".join(TARGETS)}.')
+        parser.add_argument('--routes', help='Solo estas rutas (separadas por comas).')
+        parser.add_argument('--output', '-o', help='Archivo JSON (por defecto stdout).')
+
+    def handle(self, *args, **options):
+        data = Dataset(options['users'], options['tasks'], options['requests'])
+        selected = set(options['routes'].split(',')) if options['routes'] else None
+        report = {
+            'meta': {
+                'timestamp': datetime.now(dt_timezone.utc).isoformat(),
+                'git_revision': _git_revision(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                **{key: options[key] for key in (
+                    'users', 'tasks', 'requests', 'concurrency', 'workers', 'threads')},
+            },
+            'results': {},
+        }
+        try:
+            for target in options['targets'].split(','):
+                report['results'][target] = self._run_target(target, data, selected, options)
+        finally:
+            data.cleanup()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f'Resultados en {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    def _run_target(self, target, data, selected, options):
+        table = {name: make for name, make in routes(data, data.pools()).items()
+                 if selected is None or name in selected}
+        requests = options['requests']
+        results = {}
+        if target == 'client':
+            throttle = {**settings.LOGIN_THROTTLE, 'ip_header': THROTTLE_IP_HEADER}
+            with override_settings(LOGIN_THROTTLE=throttle):
+                for name, make in table.items():
+                    results[name] = benchmarking.summarize(
+                        *benchmarking.client_load(requests, make))
+                    self.stderr.write(f'[client] {name}: {results[name]["rps"]} req/s')
+            return results
+
+        env = {'TASKS_ASYNC_VIEWS': '1' if target == 'uvicorn' else '0',
+               'LOGIN_THROTTLE_IP_HEADER': THROTTLE_IP_HEADER}
+        with benchmarking.run_server(target, options['workers'], options['threads'],
+                                     env) as port:
+            for name, make in table.items():
+                results[name] = benchmarking.summarize(
+                    *benchmarking.http_load(port, requests, options['concurrency'], make))
+                self.stderr.write(f'[{target}] {name}: {results[name]["rps"]} req/s')
+        return results
@@ -0,0 +1,75 @@
+"""
+Comando bench_servers
+
+Compara peticiones/segundo y latencias (p50/p95/p99) de la lista de tareas
+servida por gunicorn (WSGI, vistas sync) y por uvicorn (ASGI, vistas de
+tasks/async_views.py) con la misma carga.
+
+Uso:
+    python manage.py bench_servers --requests 2000 --concurrency 32 --json
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from tasks import benchmarking
+from tasks.models import Task
+
+BENCH_USERNAME = 'bench_servers'
+
+
+class Command(BaseCommand):
+    """
+    Benchmark WSGI (gunicorn) contra ASGI (uvicorn).
+    """
+    help = 'Compara gunicorn WSGI y uvicorn ASGI sobre la lista de tareas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Hilos por worker de gunicorn.')
+        parser.add_argument('--tasks', type=int, default=100,
+                            help='Tareas pendientes del usuario de prueba.')
+        parser.add_argument('--json', action='store_true',
+                            help='Imprime el resultado como JSON.')
+
+    def handle(self, *args, **options):
+        User.objects.filter(username=BENCH_USERNAME).delete()
+        user = User.objects.create(username=BENCH_USERNAME)
+        Task.objects.bulk_create(
+            [Task(title=f'Tarea {n}', descripcion='benchmark', user=user)
+             for n in range(options['tasks'])])
+        headers = {'Cookie': benchmarking.session_cookie(user)}
+        path = reverse('list_tasks')
+
+        results = {}
+        try:
+            # gunicorn con vistas sync, uvicorn con vistas async
+            for kind, env in (('gunicorn', {'TASKS_ASYNC_VIEWS': '0'}),
+                              ('uvicorn', {'TASKS_ASYNC_VIEWS': '1'})):
+                with benchmarking.run_server(kind, options['workers'],
+                                             options['threads'], env) as port:
+                    # Calentamiento: conexiones a la BBDD, plantillas, cache
+                    benchmarking.http_load(
+                        port, options['concurrency'] * 2, options['concurrency'],
+                        lambda i: ('GET', path, None, headers))
+                    results[kind] = benchmarking.summarize(*benchmarking.http_load(
+                        port, options['requests'], options['concurrency'],
+                        lambda i: ('GET', path, None, headers)))
+        finally:
+            User.objects.filter(username=BENCH_USERNAME).delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"servidor":<10}{"req/s":>10}{"p50 ms":>10}'
+                          f'{"p99 ms":>10}{"errores":>10}')
+        # Si todas las peticiones fallaron, summarize() deja None en las latencias
+        for kind, summary in results.items():
+            self.stdout.write(
+                f'{kind:<10}{summary["rps"]!s:>10}{summary["p50_ms"]!s:>10}'
+                f'{summary["p99_ms"]!s:>10}{summary["errors"]:>10}')
@@ -0,0 +1,138 @@
+"""
+Comando bench_task_indexes
+
+Siembra tareas para un usuario de prueba y compara los planes (EXPLAIN) y los
+tiempos de las consultas de show_tasks y completed_tasks sin y con los indices
+declarados en Task.Meta.indexes.
+
+Uso:
+    python manage.py bench_task_indexes --tasks 50000 --repeat 20
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from tasks.models import Task
+
+BENCH_USERNAME = 'bench_task_indexes'
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de los indices de la lista de tareas.
+    Los datos sembrados se borran al terminar y los indices siempre se
+    vuelven a crear, aunque el benchmark falle a la mitad.
+    """
+    help = 'Compara EXPLAIN y tiempos de las listas de tareas sin y con indices.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000,
+                            help='Tareas del usuario principal (default 20000).')
+        parser.add_argument('--noise-users', type=int, default=5,
+                            help='Usuarios extra con el mismo volumen de tareas.')
+        parser.add_argument('--repeat', type=int, default=10,
+                            help='Repeticiones por consulta.')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Usa EXPLAIN ANALYZE (solo PostgreSQL).')
+
+    def handle(self, *args, **options):
+        user = self._seed(options['tasks'], options['noise_users'])
+        indexes = Task._meta.indexes  # pylint: disable=no-member
+        try:
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Task, index)
+            self._analyze()
+            before = self._measure(user, options)
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Task, index)
+            self._analyze()
+            after = self._measure(user, options)
+        finally:
+            self._restore_indexes(indexes)
+            User.objects.filter(username__startswith=BENCH_USERNAME).delete()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nResumen (ms, mediana)'))
+        for name, timing in before.items():
+            self.stdout.write(
+                f'{name:<10} sin indices: {timing:9.2f}   con indices: {after[name]:9.2f}')
+
+    def _seed(self, total, noise_users):
+        """
+        Crea el usuario principal y los usuarios de ruido con bulk_create.
+        La mitad de las tareas queda completada.
+        """
+        User.objects.filter(username__startswith=BENCH_USERNAME).delete()
+        users = [User.objects.create(username=BENCH_USERNAME)]
+        users += [User.objects.create(username=f'{BENCH_USERNAME}_{n}')
+                  for n in range(noise_users)]
+        now = timezone.now()
+        for user in users:
+            batch = [
+                Task(
+                    title=f'Tarea {n}',
+                    descripcion='benchmark',
+                    user=user,
+                    important=n % 7 == 0,
+                    datecompleted=now - timedelta(minutes=n) if n % 2 else None,
+                )
+                for n in range(total)
+            ]
+            Task.objects.bulk_create(batch, batch_size=2000)
+        self.stdout.write(
+            f'Sembradas {total * len(users)} tareas para {len(users)} usuarios.')
+        return users[0]
+
+    def _queries(self, user):
+        """
+        Las mismas consultas que ejecutan show_tasks y completed_tasks.
+        """
+        return {
+            'pending': Task.objects.filter(user=user, datecompleted__isnull=True),
+            'completed': Task.objects.filter(
+                user=user, datecompleted__isnull=False).order_by('-datecompleted'),
+        }
+
+    def _measure(self, user, options):
+        """
+        Imprime el plan de cada consulta y devuelve la mediana de tiempos en ms.
+        """
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options = {'analyze': True, 'buffers': True}
+        results = {}
+        for name, queryset in self._queries(user).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n[{name}] EXPLAIN'))
+            self.stdout.write(queryset.explain(**explain_options))
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(timings)
+        return results
+
+    def _analyze(self):
+        """
+        Actualiza las estadisticas del planner despues de cada cambio de indices.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Task._meta.db_table}')  # pylint: disable=no-member
+
+    def _restore_indexes(self, indexes):
+        """
+        Vuelve a crear los indices que falten (por ejemplo si hubo un error).
+        """
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(
+                cursor, Task._meta.db_table)  # pylint: disable=no-member
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                if index.name not in existing:
+                    editor.add_index(Task, index)
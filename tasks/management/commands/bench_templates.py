@@ -0,0 +1,149 @@
+"""
+Comando bench_templates
+
+Mide render() de cada plantilla que devuelven tasks/views.py y
+customerrors/views.py, con contextos como los de las vistas (tasks.html con
+--rows filas), en dos variantes:
+
+    plain       filesystem + app_directories sin cache: cada render() vuelve
+                a leer y compilar la plantilla y sus padres
+    configured  settings.TEMPLATES: cached loader + MinifyingLoader y el
+                {% cache %} de la barra de navegación
+
+Por cada plantilla informa la primera carga (compilación), las latencias
+p50/p95/p99 de render() y los bytes generados. No toca la BBDD: el usuario
+no se guarda y los contadores van precargados en la petición.
+
+Uso:
+    python manage.py bench_templates --rows 1000 --iterations 200 -o templates.json
+"""
+import json
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import Engine, RequestContext, engines
+from django.test import RequestFactory
+from django.utils import timezone
+
+from tasks import benchmarking
+from tasks.formauth import RegistroForm
+from tasks.models import Task, TaskStats
+from tasks.signin import LoginForm
+from tasks.taskform import TaskForm
+
+
+def contexts(rows):
+    """
+    plantilla -> (autenticado, contexto), como los arman las vistas.
+    """
+    now = timezone.now()
+    tasks = [{'id': n, 'title': f'Tarea {n}', 'descripcion': 'benchmark ' * 5,
+              'created': now - timedelta(minutes=n), 'datecompleted': None,
+              'important': n % 10 == 0} for n in range(rows)]
+    page = SimpleNamespace(has_other_pages=True, has_previous=True, has_next=True,
+                           previous_cursor='cursor-previo', next_cursor='cursor-siguiente')
+    task = Task(id=1, title='Tarea 1', descripcion='benchmark', created=now)
+    return {
+        'tasks/home.html': (False, {}),
+        'tasks/signin.html': (False, {'form': LoginForm()}),
+        'tasks/signup.html': (False, {'form': RegistroForm()}),
+        'tasks/create_task.html': (True, {'form': TaskForm()}),
+        'tasks/task_detail.html': (True, {'form': TaskForm(instance=task),
+                                          'filter_task': task}),
+        'tasks/tasks.html': (True, {'tasks': tasks, 'page': page, 'query': '',
+                                    'status': 'Pending'}),
+        'customerrors/404.html': (False, {
+            'status_code': 404, 'title': 'Tarea con ID: 1 no encontrada',
+            'mensaje': 'La tarea solicitada no existe o fue eliminada.',
+            'small_title': 'Tarea'}),
+        'customerrors/500.html': (False, {}),
+    }
+
+
+def variants():
+    """
+    nombre -> Engine. 'plain' comparte context processors con el configurado.
+    """
+    configured = engines['django'].engine
+    plain = Engine(
+        dirs=configured.dirs, debug=False,
+        loaders=['django.template.loaders.filesystem.Loader',
+                 'django.template.loaders.app_directories.Loader'],
+        context_processors=configured.context_processors,
+        libraries=configured.libraries, builtins=configured.builtins)
+    return {'plain': plain, 'configured': configured}
+
+
+def make_request(authenticated):
+    request = RequestFactory().get('/')
+    if authenticated:
+        request.user = User(pk=0, username='bench_templates')
+        # Lo que precargan las vistas async: así el render no consulta la BBDD
+        request.task_stats = TaskStats(pending=750, completed=250, important=75, version=1)
+    else:
+        request.user = AnonymousUser()
+    return request
+
+
+class Command(BaseCommand):
+    """
+    Benchmark de render() por plantilla.
+    """
+    help = 'Mide el renderizado de cada plantilla con y sin los loaders configurados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Filas de tasks/tasks.html.')
+        parser.add_argument('--iterations', type=int, default=200,
+                            help='Renders por plantilla y variante.')
+        parser.add_argument('--output', '-o', help='Archivo JSON (por defecto stdout).')
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, (authenticated, context) in contexts(options['rows']).items():
+            results[name] = {}
+            for variant, engine in variants().items():
+                results[name][variant] = self._run(engine, name, authenticated, context,
+                                                   options['iterations'])
+                summary = results[name][variant]
+                self.stderr.write(f'[{variant}] {name}: p50 {summary["p50_ms"]} ms, '
+                                  f'{summary["bytes"]} bytes')
+
+        output = json.dumps({'options': {key: options[key] for key in (
+            'rows', 'iterations')}, 'results': results}, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(f'Resultados en {options["output"]}')
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def _run(engine, name, authenticated, context, iterations):
+        # pylint: disable=too-many-arguments
+        for loader in engine.template_loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
+        cache.clear()
+        request = make_request(authenticated)
+
+        start = time.perf_counter()
+        engine.get_template(name)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            began = time.perf_counter()
+            # get_template() en cada vuelta, como render() en las vistas
+            html = engine.get_template(name).render(RequestContext(request, context))
+            latencies.append((time.perf_counter() - began) * 1000)
+        seconds = time.perf_counter() - start
+
+        summary = benchmarking.summarize(latencies, [], seconds)
+        summary.update(compile_ms=round(compile_ms, 2), bytes=len(html.encode()))
+        return summary
@@ -0,0 +1,85 @@
+"""
+Comando check_static
+
+Verifica que cada {% static '...' %} de las plantillas del proyecto se
+resuelva a una entrada del manifest de collectstatic (staticfiles.json en
+STATIC_ROOT), que el archivo con hash exista y que tenga sus variantes
+comprimidas .br y .gz. Pensado para correr en build.sh después de
+collectstatic: si falla, el deploy se corta en lugar de servir 404 (o HTML
+en vez de CSS) en producción.
+
+WhiteNoise no comprime los formatos ya comprimidos (png, woff2, ...) ni los
+archivos en los que no se gana nada; a esos no se les exigen variantes.
+
+Las referencias que no son literales ({% static variable %}) no se pueden
+verificar y solo se informan.
+
+Uso:
+    python manage.py collectstatic --no-input && python manage.py check_static
+"""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from djangocrud.template_loaders import template_files
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+(?:(['"])(?P<path>.+?)\1|(?P<expr>\S+))""")
+
+
+def static_references():
+    """
+    (plantilla, referencia, es_literal) por cada {% static %} encontrado.
+    """
+    for name, path in template_files():
+        for match in STATIC_TAG.finditer(path.read_text(encoding='utf-8')):
+            if match['path']:
+                yield name, match['path'], True
+            else:
+                yield name, match['expr'], False
+
+
+class Command(BaseCommand):
+    """
+    Verificación de los estáticos referenciados contra el manifest.
+    """
+    help = 'Verifica que cada {% static %} esté en el manifest, con hash y comprimido.'
+
+    def handle(self, *args, **options):
+        storage = CompressedManifestStaticFilesStorage()
+        manifest = storage.hashed_files
+        if not manifest:
+            raise CommandError(
+                f'No hay manifest en {storage.location}; corre collectstatic primero.')
+        compressor = Compressor(quiet=True)
+
+        errors, checked = [], 0
+        for template, reference, literal in static_references():
+            if not literal:
+                self.stdout.write(f'{template}: {{% static {reference} %}} no es literal, se omite')
+                continue
+            checked += 1
+            hashed = manifest.get(reference)
+            if hashed is None:
+                errors.append(f'{template}: {reference} no está en el manifest')
+                continue
+            if hashed == reference or not storage.exists(hashed):
+                errors.append(f'{template}: {reference} -> {hashed} no existe con hash')
+                continue
+            if compressor.should_compress(hashed):
+                missing = [suffix for suffix in ('.br', '.gz')
+                           if not storage.exists(hashed + suffix)]
+                # Sin ninguna variante puede ser un archivo que no compensa
+                # comprimir; sin una sola de las dos, falló la compresión
+                if len(missing) == 1:
+                    errors.append(f'{template}: {hashed} no tiene variante {missing[0]}')
+                elif missing and storage.size(hashed) > 1024:
+                    errors.append(f'{template}: {hashed} no tiene variantes comprimidas')
+
+        for error in errors:
+            self.stderr.write(error)
+        if errors:
+            raise CommandError(f'{len(errors)} de {checked} referencias con problemas.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} referencias a estáticos verificadas en el manifest.'))
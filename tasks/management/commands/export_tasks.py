@@ -0,0 +1,49 @@
+"""
+Comando export_tasks
+
+Exporta las tareas de un usuario en CSV o NDJSON (opcionalmente gzip) a un
+archivo o a la salida estándar, con memoria constante.
+
+Uso:
+    python manage.py export_tasks ana --format ndjson --gzip --output ana.ndjson.gz
+"""
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import export
+
+
+class Command(BaseCommand):
+    """
+    Exportación en streaming de las tareas de un usuario.
+    """
+    help = 'Exporta las tareas de un usuario en CSV o NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument('--status', choices=sorted(export.STATUS_FILTERS), default='all')
+        parser.add_argument('--gzip', action='store_true', help='Comprime la salida.')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE,
+                            help='Filas leídas de la BBDD por bloque.')
+        parser.add_argument('--output', '-o', help='Archivo destino (por defecto stdout).')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist as exc:
+            raise CommandError(f'No existe el usuario {options["username"]}') from exc
+
+        blocks = export.stream(user, options['format'], options['status'],
+                               options['gzip'], options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for block in blocks:
+                    output.write(block)
+            self.stderr.write(f'Exportado en {options["output"]}')
+        else:
+            for block in blocks:
+                sys.stdout.buffer.write(block)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,238 @@
+"""
+Comando import_tasks
+
+Carga tareas desde un archivo CSV o JSONL (opcionalmente .gz) con columnas:
+    username, title, descripcion, important, datecompleted
+
+El archivo se lee en streaming; cada fila se valida con las reglas de los
+campos de TaskForm (y los validadores del modelo, como max_length) sin crear
+un formulario por fila, y se inserta con bulk_create en lotes dentro de
+transacciones de tamaño configurable, junto con un ajuste de TaskStats por
+usuario. Los usernames se resuelven a ids con una consulta por lote y se
+guardan en un dict para el resto de la carga.
+
+Uso:
+    python manage.py import_tasks tareas.jsonl --batch-size 2000 --transaction-size 20000
+"""
+import copy
+import csv
+import gzip
+import json
+import sys
+import time
+
+from django import forms
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tqdm import tqdm
+
+from tasks import stats, taskcache
+from tasks.models import Task
+from tasks.taskform import TaskForm
+
+
+class RowValidator:
+    """
+    Valida una fila con los campos de TaskForm, creados una sola vez.
+    """
+
+    def __init__(self):
+        # Solo los campos del modelo (no la versión de las ediciones)
+        self.fields = {name: copy.deepcopy(field) for name, field in TaskForm.base_fields.items()
+                       if name in TaskForm.Meta.fields}
+        self.fields['datecompleted'] = forms.DateTimeField(required=False)
+
+    def clean(self, row):
+        """
+        Devuelve el dict de valores limpios o lanza ValidationError con los
+        errores de todos los campos.
+        """
+        cleaned = {}
+        errors = {}
+        for name, field in self.fields.items():
+            value = row.get(name)
+            if isinstance(value, (bool, int)) and name == 'important':
+                value = bool(value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            elif value is not None and not isinstance(value, str):
+                # Un objeto o una lista no se guardan como su repr()
+                errors[name] = [f'Se esperaba texto, no {type(value).__name__}.']
+                continue
+            try:
+                cleaned[name] = field.clean(value)
+                if name in TaskForm.Meta.fields:
+                    Task._meta.get_field(name).run_validators(cleaned[name])  # pylint: disable=no-member
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+
+class UserResolver:
+    """
+    username -> id con cache en memoria; los desconocidos se buscan con una
+    sola consulta por lote.
+    """
+
+    def __init__(self):
+        self.ids = {}
+
+    def prefetch(self, usernames):
+        missing = set(usernames) - self.ids.keys()
+        if missing:
+            found = dict(User.objects.filter(username__in=missing)
+                         .values_list('username', 'id'))
+            for username in missing:
+                self.ids[username] = found.get(username)
+
+    def get(self, username):
+        return self.ids.get(username)
+
+
+def read_rows(path, fmt):
+    """
+    Generador de (número de línea, fila) del archivo. En JSONL la fila es lo
+    que haya en la línea (None si no es JSON válido); Importer.flush()
+    rechaza lo que no sea un objeto.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as source:
+        if fmt == 'csv':
+            for line, row in enumerate(csv.DictReader(source), start=2):
+                yield line, row
+        else:
+            for line, text in enumerate(source, start=1):
+                if text.strip():
+                    try:
+                        row = json.loads(text)
+                    except ValueError:
+                        row = None
+                    yield line, row
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.endswith('.csv') else 'jsonl'
+
+
+class Importer:
+    """
+    Estado de una carga: valida las filas, resuelve los usuarios e inserta
+    cada transacción, contando insertadas y rechazadas.
+    """
+
+    def __init__(self, options, stderr):
+        self.options = options
+        self.stderr = stderr
+        self.validator = RowValidator()
+        self.users = UserResolver()
+        self.inserted = 0
+        self.rejected = 0
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        self.stderr.write(f'Línea {line}: {reason}')
+        if self.rejected > self.options['max_errors']:
+            message = f'Más de {self.options["max_errors"]} filas inválidas, importación abortada.'
+            if not self.options['dry_run']:
+                message += (f' Las transacciones ya confirmadas ({self.inserted} tareas) '
+                            'se conservan.')
+            raise CommandError(message)
+
+    def flush(self, pending):
+        """
+        Valida las filas de una transacción y las inserta por lotes.
+        """
+        rows = []
+        for line, row in pending:
+            if row is None:
+                self.reject(line, 'JSON inválido')
+            elif not isinstance(row, dict):
+                self.reject(line, f'se esperaba un objeto JSON, no {type(row).__name__}')
+            elif not isinstance(row.get('username'), str):
+                self.reject(line, 'username debe ser texto')
+            else:
+                rows.append((line, row))
+        if not rows:
+            return
+        self.users.prefetch(row['username'] for _, row in rows)
+        tasks = []
+        for line, row in rows:
+            user_id = self.users.get(row['username'])
+            if user_id is None:
+                self.reject(line, f'usuario desconocido {row["username"]!r}')
+                continue
+            try:
+                cleaned = self.validator.clean(row)
+            except ValidationError as exc:
+                self.reject(line, json.dumps(exc.message_dict, ensure_ascii=False))
+                continue
+            tasks.append(Task(user_id=user_id, **cleaned))
+
+        if tasks and not self.options['dry_run']:
+            changes = {}
+            for task in tasks:
+                user_changes = changes.setdefault(task.user_id, dict.fromkeys(stats.FIELDS, 0))
+                for field, value in stats.deltas(after=stats.state(task)).items():
+                    user_changes[field] += value
+            with transaction.atomic():
+                batch_size = self.options['batch_size']
+                for start in range(0, len(tasks), batch_size):
+                    Task.objects.bulk_create(tasks[start:start + batch_size])
+                for user_id, user_changes in changes.items():
+                    stats.adjust(user_id, **user_changes)
+            taskcache.bump_version(*changes)
+        self.inserted += len(tasks)
+
+
+class Command(BaseCommand):
+    """
+    Importación masiva de tareas.
+    """
+    help = 'Importa tareas desde CSV o JSONL con bulk_create por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Por defecto se deduce de la extensión.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Filas por bulk_create.')
+        parser.add_argument('--transaction-size', type=int, default=10000,
+                            help='Filas por transacción.')
+        parser.add_argument('--max-errors', type=int, default=100,
+                            help='Aborta si hay más filas inválidas que esto.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo valida, no inserta.')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        # Para que csv.DictReader acepte descripciones largas
+        csv.field_size_limit(16 * 1024 * 1024)
+        importer = Importer(options, self.stderr)
+
+        start = time.perf_counter()
+        pending = []
+        try:
+            with tqdm(unit=' filas', file=sys.stderr,
+                      disable=options['verbosity'] == 0) as progress:
+                for line, row in read_rows(options['path'], fmt):
+                    pending.append((line, row))
+                    if len(pending) >= options['transaction_size']:
+                        importer.flush(pending)
+                        progress.update(len(pending))
+                        pending = []
+                importer.flush(pending)
+                progress.update(len(pending))
+        except (OSError, csv.Error) as exc:
+            raise CommandError(str(exc)) from exc
+
+        elapsed = time.perf_counter() - start
+        rate = importer.inserted / elapsed if elapsed else 0
+        action = 'se importarían' if options['dry_run'] else 'importadas'
+        self.stdout.write(self.style.SUCCESS(
+            f'{importer.inserted} tareas {action}, {importer.rejected} filas rechazadas '
+            f'en {elapsed:.1f}s ({rate:.0f} filas/s).'))
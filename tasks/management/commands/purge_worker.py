@@ -0,0 +1,66 @@
+"""
+Comando purge_worker
+
+Worker de borrado en segundo plano (ver tasks.purge): procesa los PurgeJob
+pendientes (usuarios borrados) y purga las tareas marcadas como borradas,
+en lotes de --batch-size con una transacción corta por lote.
+
+Sin --once queda en un bucle, revisando cada --interval segundos. Se pueden
+correr varios workers: cada PurgeJob lo toma uno solo (SKIP LOCKED) y si un
+worker muere, otro retoma su trabajo pasado --stale-after segundos.
+
+Uso:
+    python manage.py purge_worker --batch-size 1000 --sleep 0.05
+    python manage.py purge_worker --once
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import purge
+
+
+class Command(BaseCommand):
+    """
+    Borrado por lotes de usuarios y tareas borrados.
+    """
+    help = 'Borra por lotes los usuarios y tareas marcados como borrados.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Segundos de pausa entre lotes.')
+        parser.add_argument('--interval', type=float, default=30.0,
+                            help='Segundos entre revisiones cuando no hay trabajo.')
+        parser.add_argument('--stale-after', type=float, default=600.0,
+                            help='Segundos sin heartbeat para retomar un trabajo.')
+        parser.add_argument('--once', action='store_true',
+                            help='Procesa lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser >= 1.')
+        while True:
+            jobs = self._run_jobs(options)
+            tasks = purge.purge_tasks(options['batch_size'], options['sleep'])
+            if jobs or tasks or options['verbosity'] > 1:
+                self.stdout.write(f'{jobs} usuarios y {tasks} tareas borrados.')
+            if options['once']:
+                return
+            if not jobs and not tasks:
+                time.sleep(options['interval'])
+
+    def _run_jobs(self, options):
+        done = 0
+        while (job := purge.claim(options['stale_after'])) is not None:
+            try:
+                purge.run(job, options['batch_size'], options['sleep'])
+            except Exception as exc:  # pylint: disable=broad-except
+                # Lo retoma otro worker (o este) pasado --stale-after
+                job.error = str(exc)
+                job.save(update_fields=['error'])
+                self.stderr.write(f'purge {job.username}: {exc}')
+                continue
+            if not job.error:
+                done += 1
+        return done
@@ -0,0 +1,81 @@
+"""
+Comando reconcile_task_stats
+
+Recalcula los contadores de TaskStats a partir de Task y TaskArchive, por lotes de
+usuarios, informa el desvío encontrado y corrige las filas que no coinciden.
+
+Uso:
+    python manage.py reconcile_task_stats --batch-size 500 [--dry-run]
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from tasks import stats, taskcache
+from tasks.models import Task, TaskArchive, TaskStats
+
+
+class Command(BaseCommand):
+    """
+    Reconciliación de contadores denormalizados.
+    """
+    help = 'Recalcula TaskStats por lotes e informa el desvío.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Usuarios por lote.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo informa, no corrige.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = drifted = missing = 0
+        total_drift = dict.fromkeys(stats.FIELDS, 0)
+        last_id = 0
+        while True:
+            user_ids = list(User.objects.filter(pk__gt=last_id).order_by('pk')
+                            .values_list('pk', flat=True)[:batch_size])
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            # Una consulta agrupada para los conteos reales del lote
+            actual = {row.pop('user_id'): row for row in (
+                Task.objects.filter(user_id__in=user_ids).values('user_id')
+                .annotate(**stats.AGGREGATES).order_by())}
+            # Las archivadas cuentan como completadas
+            for row in (TaskArchive.objects.filter(user_id__in=user_ids).values('user_id')
+                        .annotate(count=Count('id')).order_by()):
+                counts = actual.setdefault(row['user_id'], dict.fromkeys(stats.FIELDS, 0))
+                counts['completed'] += row['count']
+            stored = TaskStats.objects.in_bulk(user_ids)
+
+            to_create, to_update = [], []
+            for user_id in user_ids:
+                counts = actual.get(user_id, dict.fromkeys(stats.FIELDS, 0))
+                row = stored.get(user_id)
+                if row is None:
+                    missing += 1
+                    to_create.append(TaskStats(user_id=user_id, **counts))
+                    continue
+                diff = {field: getattr(row, field) - counts[field] for field in stats.FIELDS}
+                if any(diff.values()):
+                    drifted += 1
+                    for field, value in diff.items():
+                        total_drift[field] += value
+                        setattr(row, field, counts[field])
+                    to_update.append(row)
+                    self.stdout.write(f'user {user_id}: desvío {diff}')
+            checked += len(user_ids)
+
+            if not options['dry_run'] and (to_create or to_update):
+                with transaction.atomic():
+                    TaskStats.objects.bulk_create(to_create, ignore_conflicts=True)
+                    TaskStats.objects.bulk_update(to_update, stats.FIELDS)
+                taskcache.bump_version(*[row.user_id for row in to_create + to_update])
+
+        action = 'encontrados' if options['dry_run'] else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(
+            f'{checked} usuarios revisados: {drifted} con desvío y {missing} sin fila '
+            f'({action}). Desvío acumulado (guardado - real): {total_drift}'))
@@ -0,0 +1,84 @@
+"""
+Contadores de la aplicación en formato Prometheus.
+
+Los contadores se guardan en el cache por defecto (cache.incr), así que con un
+backend compartido (Redis, Memcached) todos los workers de gunicorn suman en
+el mismo valor. Con LocMemCache cada proceso tiene los suyos.
+
+Uso:
+    from . import metrics
+    metrics.register('tasks_list_cache_hits_total', 'Aciertos del cache de listas')
+    metrics.incr('tasks_list_cache_hits_total')
+"""
+from django.core.cache import cache
+
+_PREFIX = 'metrics:'
+
+# nombre -> (tipo, descripción, función que devuelve el valor o None)
+_REGISTRY = {}
+
+
+def register(name, description):
+    """
+    Declara un contador. Es idempotente, se puede llamar al importar el módulo.
+    """
+    _REGISTRY.setdefault(name, ('counter', description, None))
+
+
+def register_gauge(name, description, func):
+    """
+    Declara un gauge cuyo valor se calcula al momento de exponer las métricas.
+    func() devuelve un número o None si el valor no está disponible.
+    """
+    _REGISTRY[name] = ('gauge', description, func)
+
+
+def incr(name, amount=1):
+    """
+    Suma `amount` al contador. Nunca lanza excepciones: una métrica perdida
+    no debe romper la petición.
+    """
+    key = _PREFIX + name
+    try:
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+    except ValueError:
+        # La clave expiró entre add() e incr()
+        cache.add(key, amount, timeout=None)
+
+
+async def aincr(name, amount=1):
+    """
+    Versión async de incr() para vistas async.
+    """
+    key = _PREFIX + name
+    try:
+        if not await cache.aadd(key, amount, timeout=None):
+            await cache.aincr(key, amount)
+    except ValueError:
+        await cache.aadd(key, amount, timeout=None)
+
+
+def value(name):
+    """
+    Valor actual de una métrica registrada.
+    """
+    kind, _, func = _REGISTRY[name]
+    if kind == 'gauge':
+        return func()
+    return cache.get(_PREFIX + name, 0)
+
+
+def render():
+    """
+    Exposición en formato de texto de Prometheus.
+    """
+    lines = []
+    for name, (kind, description, _) in sorted(_REGISTRY.items()):
+        current = value(name)
+        if current is None:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.append(f'{name} {current}')
+    return '\n'.join(lines) + '\n'
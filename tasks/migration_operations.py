@@ -0,0 +1,46 @@
+"""
+Operaciones de migración para los índices de tasks_task.
+
+En PostgreSQL un AddIndex/RemoveIndex normal bloquea las escrituras de la
+tabla mientras dura; con CONCURRENTLY no, pero no puede correr dentro de
+una transacción (la migración debe declarar atomic = False). SQLite no
+tiene CONCURRENTLY: ahí se usa la operación normal.
+"""
+from django.contrib.postgres import operations as postgres_operations
+from django.db.migrations.operations import AddIndex, RemoveIndex
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    """
+    CREATE INDEX CONCURRENTLY en PostgreSQL, AddIndex en los demás motores.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexConcurrently(postgres_operations.RemoveIndexConcurrently):
+    """
+    DROP INDEX CONCURRENTLY en PostgreSQL, RemoveIndex en los demás motores.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
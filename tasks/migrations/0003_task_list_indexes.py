@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:14
+#
+# Índices creados con CONCURRENTLY en PostgreSQL para no bloquear las
+# escrituras de tasks_task (ver tasks/migration_operations.py).
+
+from django.conf import settings
+from django.db import migrations, models
+
+from tasks.migration_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0002_remove_task_datacompleted_task_datecompleted'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('datecompleted__isnull', True)), fields=['user', 'created', 'id'], name='task_pending_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('datecompleted__isnull', False)), fields=['user', '-datecompleted', '-id'], name='task_completed_user_idx'),
+        ),
+    ]
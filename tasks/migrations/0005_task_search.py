@@ -0,0 +1,25 @@
+# Índice de texto completo de Task: columna tsvector + GIN en PostgreSQL,
+# tabla virtual FTS5 + triggers en SQLite (ver tasks/search.py).
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):  # pylint: disable=unused-argument
+    from tasks import search  # pylint: disable=import-outside-toplevel
+    search.create_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):  # pylint: disable=unused-argument
+    from tasks import search  # pylint: disable=import-outside-toplevel
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_taskstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,73 @@
+# TaskArchive: el estado del modelo se crea con CreateModel y la tabla con
+# RunPython, para poder crearla particionada por mes en PostgreSQL.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE tasks_taskarchive (
+        id bigint NOT NULL,
+        title varchar(100) NOT NULL,
+        descripcion text NOT NULL,
+        created timestamp with time zone NOT NULL,
+        datecompleted timestamp with time zone NOT NULL,
+        important boolean NOT NULL,
+        user_id integer NOT NULL
+            REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+        archived_at timestamp with time zone NOT NULL,
+        PRIMARY KEY (id, datecompleted)
+    ) PARTITION BY RANGE (datecompleted)
+    """,
+    """
+    CREATE INDEX taskarchive_user_idx
+    ON tasks_taskarchive (user_id, datecompleted DESC, id DESC)
+    """,
+]
+
+
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_CREATE:
+            schema_editor.execute(sql)
+    else:
+        schema_editor.create_model(apps.get_model('tasks', 'TaskArchive'))
+
+
+def drop_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        # Borra también las particiones
+        schema_editor.execute('DROP TABLE tasks_taskarchive CASCADE')
+    else:
+        schema_editor.delete_model(apps.get_model('tasks', 'TaskArchive'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='TaskArchive',
+                fields=[
+                    ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                    ('title', models.CharField(max_length=100)),
+                    ('descripcion', models.TextField(blank=True)),
+                    ('created', models.DateTimeField()),
+                    ('datecompleted', models.DateTimeField()),
+                    ('important', models.BooleanField(default=False)),
+                    ('archived_at', models.DateTimeField(auto_now_add=True)),
+                    ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ],
+                options={
+                    'indexes': [models.Index(fields=['user', '-datecompleted', '-id'], name='taskarchive_user_idx')],
+                },
+            ),
+        ]),
+        migrations.RunPython(create_table, drop_table),
+    ]
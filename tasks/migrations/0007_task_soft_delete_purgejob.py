@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:45
+#
+# Los índices de tasks_task se recrean con CONCURRENTLY en PostgreSQL para
+# no bloquear las escrituras (ver tasks/migration_operations.py).
+
+from django.db import migrations, models
+
+from tasks.migration_operations import AddIndexConcurrently, RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0006_taskarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurgeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(db_index=True)),
+                ('username', models.CharField(max_length=150)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('deleted', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='task_pending_user_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='task',
+            name='task_completed_user_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('datecompleted__isnull', True), ('deleted_at__isnull', True)), fields=['user', 'created', 'id'], name='task_pending_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('datecompleted__isnull', False), ('deleted_at__isnull', True)), fields=['user', '-datecompleted', '-id'], name='task_completed_user_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='task_deleted_idx'),
+        ),
+    ]
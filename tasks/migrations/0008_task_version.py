@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:53
+#
+# Agregar una columna NOT NULL con default hace que SQLite recree tasks_task
+# (_remake_table), lo que borra los triggers de búsqueda: se vuelven a crear
+# después, en los dos sentidos (ver tasks/search.py).
+
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):  # pylint: disable=unused-argument
+    from tasks import search  # pylint: disable=import-outside-toplevel
+    search.create_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_soft_delete_purgejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_search_index),
+        migrations.AddField(
+            model_name='task',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(create_search_index, migrations.RunPython.noop),
+    ]
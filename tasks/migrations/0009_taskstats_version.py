@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:14
+
+import tasks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstats',
+            name='version',
+            field=models.BigIntegerField(default=tasks.models.clock_version, editable=False),
+        ),
+    ]
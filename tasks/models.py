@@ -2,12 +2,25 @@
 Importamos las librerías necesarias para la implementacion del mapeo de las
 clases con las tablas de BBDD
 """
+import time
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 
 
+class LiveTaskManager(models.Manager):
+    """
+    Manager por defecto de Task: oculta las tareas borradas (deleted_at no
+    nulo), que quedan en la tabla hasta que manage.py purge_worker las borre.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Task(models.Model):
     """
     Definicion de los atributos de la clase Task para el mapeo y creacion de
@@ -20,9 +33,141 @@ class Task(models.Model):
     datecompleted = models.DateTimeField(null=True, blank=True)
     important = models.BooleanField(default=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Control de concurrencia optimista de las ediciones (tasks.writes)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = LiveTaskManager()
+    # Incluye las borradas; solo para el purgado y el mantenimiento
+    all_objects = models.Manager()
+
+    class Meta:
+        """
+        Indices para las consultas de show_tasks y completed_tasks.
+        Son indices parciales: cada uno solo contiene las filas del conjunto que
+        consulta (pendientes o completadas, sin borrar), asi el planner no
+        recorre ni ordena todas las tareas del usuario.
+        task_completed_user_idx cubre ademas el order_by('-datecompleted').
+        task_deleted_idx es el que recorre el purgado.
+        """
+        indexes = [
+            models.Index(
+                fields=['user', 'created', 'id'],
+                name='task_pending_user_idx',
+                condition=models.Q(datecompleted__isnull=True, deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['user', '-datecompleted', '-id'],
+                name='task_completed_user_idx',
+                condition=models.Q(datecompleted__isnull=False, deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['deleted_at'],
+                name='task_deleted_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         """
         Esto hace que se muestre el titulo y el usuario de la tarea en el Admin site
         """
         return f'{self.title} - by {self.user.username}'  # pylint: disable=no-member
+
+    def soft_delete(self):
+        """
+        Marca la tarea como borrada con un UPDATE de una columna; el DELETE
+        real lo hace manage.py purge_worker.
+        """
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+
+    async def asoft_delete(self):
+        self.deleted_at = timezone.now()
+        await self.asave(update_fields=['deleted_at'])
+
+
+def clock_version():
+    """
+    Versión inicial de TaskStats: microsegundos desde el epoch. Si la fila se
+    borra y se vuelve a crear, la nueva versión es mayor que cualquiera usada
+    antes y no puede revivir páginas cacheadas viejas.
+    """
+    return time.time_ns() // 1000
+
+
+class TaskStats(models.Model):
+    """
+    Contadores por usuario para los badges de tasks/base.html, mantenidos de
+    forma incremental (UPDATE ... SET pending = pending + 1) por tasks.stats
+    en cada escritura, para no hacer COUNT(*) sobre Task en cada página.
+    important cuenta solo las tareas pendientes marcadas como importantes.
+
+    version es la versión de los datos de tareas del usuario que usa
+    tasks.taskcache: cada escritura la incrementa.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='task_stats')
+    pending = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    important = models.IntegerField(default=0)
+    version = models.BigIntegerField(default=clock_version, editable=False)
+
+    def __str__(self):
+        return (f'{self.pending} pending / {self.completed} completed / '
+                f'{self.important} important')
+
+
+class TaskArchive(models.Model):
+    """
+    Tareas completadas hace tiempo, movidas fuera de Task por
+    manage.py archive_tasks para que la tabla e índices calientes solo
+    tengan las tareas recientes. Conserva el id original de la tarea.
+
+    En PostgreSQL la tabla está particionada por mes de datecompleted (la
+    crea la migración 0006 a mano y tasks.archive agrega las particiones);
+    en los demás motores es una tabla normal.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    descripcion = models.TextField(blank=True)
+    created = models.DateTimeField()
+    datecompleted = models.DateTimeField()
+    important = models.BooleanField(default=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """
+        Índice para la paginación de completed_tasks sobre (datecompleted, id).
+        """
+        indexes = [
+            models.Index(fields=['user', '-datecompleted', '-id'],
+                         name='taskarchive_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} - by {self.user.username}'  # pylint: disable=no-member
+
+
+class PurgeJob(models.Model):
+    """
+    Borrado pendiente de un usuario. Al pedirlo (tasks.purge.request_deletion)
+    el usuario queda inactivo y se crea esta fila; manage.py purge_worker
+    borra sus tareas por lotes y al final el usuario.
+
+    user_id no es una FK: el trabajo sobrevive al borrado del usuario como
+    registro de lo que se hizo.
+    """
+    user_id = models.IntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    # Lo renueva el worker en cada lote; uno viejo indica un worker caído
+    heartbeat = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    deleted = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        status = 'finished' if self.finished_at else 'pending'
+        return f'purge {self.username} ({status}, {self.deleted} rows)'
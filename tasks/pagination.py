@@ -0,0 +1,193 @@
+"""
+Paginación por cursor (keyset) para las listas de tareas.
+
+A diferencia de Paginator de Django (LIMIT/OFFSET), cada página se pide con
+un WHERE sobre la clave de orden de la última fila vista, por ejemplo:
+    WHERE (created, id) > (<created del cursor>, <id del cursor>)
+    ORDER BY created, id LIMIT 26
+
+Así el costo de una página no depende de cuántas páginas haya recorrido el
+usuario, y la consulta usa los índices de Task.Meta.indexes.
+"""
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def encode_cursor(value, pk):
+    """
+    Convierte (valor de la clave, id) en un token seguro para la URL.
+    """
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Inversa de encode_cursor. Devuelve None si el token no es válido
+    (URL manipulada, cursor antiguo, etc.).
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(value), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """
+    Una página de resultados y los cursores para moverse a la siguiente y
+    a la anterior.
+    """
+    object_list: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """
+    Pagina un queryset ordenado por (key, id).
+
+    key: nombre del campo de orden ('created' o 'datecompleted').
+    descending: True para orden de más reciente a más antiguo.
+    """
+
+    def __init__(self, queryset, key, descending=False, page_size=None):
+        self.queryset = queryset
+        self.key = key
+        self.descending = descending
+        self.page_size = page_size or settings.TASKS_PAGE_SIZE
+
+    def _ordering(self, reverse):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return [f'{prefix}{self.key}', f'{prefix}id']
+
+    def _seek(self, cursor, reverse):
+        """
+        Filtro "después de este cursor" según la dirección de recorrido:
+        (key, id) < (valor, pk), escrito como
+            key <= valor AND (key < valor OR id < pk)
+        El OR solo no sirve para buscar en el índice (user, key, id); la
+        condición de rango sobre key delante sí, en SQLite y en PostgreSQL.
+        """
+        value, pk = cursor
+        op = 'lt' if self.descending != reverse else 'gt'
+        return (Q(**{f'{self.key}__{op}e': value})
+                & (Q(**{f'{self.key}__{op}': value}) | Q(**{f'id__{op}': pk})))
+
+    def _cursor(self, row):
+        if isinstance(row, dict):
+            return encode_cursor(row[self.key], row['id'])
+        return encode_cursor(getattr(row, self.key), row.pk)
+
+    def _prepare(self, after, before):
+        """
+        Arma la consulta de la página: (queryset limitado, cursor, reverse).
+        """
+        after = decode_cursor(after)
+        before = None if after else decode_cursor(before)
+        reverse = before is not None
+        cursor = before or after
+
+        queryset = self.queryset.order_by(*self._ordering(reverse))
+        if cursor:
+            queryset = queryset.filter(self._seek(cursor, reverse))
+        return queryset[:self.page_size + 1], cursor, reverse
+
+    def _build(self, rows, cursor, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([])
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else cursor is not None
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor(rows[-1]) if has_next else None,
+            previous_cursor=self._cursor(rows[0]) if has_previous else None,
+        )
+
+    def page(self, after=None, before=None):
+        """
+        Devuelve la página que sigue a `after` o la que precede a `before`.
+        Sin cursores devuelve la primera página.
+        """
+        queryset, cursor, reverse = self._prepare(after, before)
+        return self._build(list(queryset), cursor, reverse)
+
+    async def apage(self, after=None, before=None):
+        """
+        Versión async de page() para las vistas de tasks.async_views.
+        """
+        queryset, cursor, reverse = self._prepare(after, before)
+        return self._build([row async for row in queryset], cursor, reverse)
+
+
+class MergedKeysetPaginator:
+    """
+    Pagina varios querysets con la misma clave como si fueran uno solo (por
+    ejemplo Task y TaskArchive en completed_tasks).
+
+    Cada página hace una consulta por queryset con el mismo cursor y LIMIT,
+    y se queda con las primeras filas de la mezcla: las filas de cada tabla
+    aparecen en su lugar por (key, id) sin importar en cuál estén.
+    """
+
+    def __init__(self, querysets, key, descending=False, page_size=None):
+        self.parts = [KeysetPaginator(queryset, key, descending, page_size)
+                      for queryset in querysets]
+        self.key = key
+        self.descending = descending
+
+    def _sort_key(self, row):
+        if isinstance(row, dict):
+            return row[self.key], row['id']
+        return getattr(row, self.key), row.pk
+
+    def _merge(self, results, reverse):
+        first = self.parts[0]
+        rows = sorted((row for rows in results for row in rows), key=self._sort_key,
+                      reverse=self.descending != reverse)
+        return rows[:first.page_size + 1]
+
+    def page(self, after=None, before=None):
+        """
+        Como KeysetPaginator.page() sobre la unión de los querysets.
+        """
+        prepared = [part._prepare(after, before) for part in self.parts]  # pylint: disable=protected-access
+        _, cursor, reverse = prepared[0]
+        rows = self._merge([list(queryset) for queryset, _, _ in prepared], reverse)
+        return self.parts[0]._build(rows, cursor, reverse)  # pylint: disable=protected-access
+
+    async def apage(self, after=None, before=None):
+        """
+        Versión async de page().
+        """
+        prepared = [part._prepare(after, before) for part in self.parts]  # pylint: disable=protected-access
+        _, cursor, reverse = prepared[0]
+        results = [[row async for row in queryset] for queryset, _, _ in prepared]
+        rows = self._merge(results, reverse)
+        return self.parts[0]._build(rows, cursor, reverse)  # pylint: disable=protected-access
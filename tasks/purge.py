@@ -0,0 +1,124 @@
+"""
+Borrado diferido de tareas y usuarios.
+
+Borrar un usuario con on_delete=CASCADE junta y borra todas sus tareas en
+una sola transacción: con miles de tareas son minutos de bloqueos y memoria
+en el worker que atiende la petición. En su lugar:
+
+- Las tareas se marcan (Task.soft_delete / QuerySet.update(deleted_at=...))
+  y el manager por defecto deja de verlas.
+- request_deletion() desactiva al usuario (ya no puede iniciar sesión ni
+  usar sus sesiones) y encola un PurgeJob.
+
+manage.py purge_worker hace el DELETE real en lotes de tamaño acotado, cada
+uno en su propia transacción corta:
+    DELETE FROM tasks_task WHERE id IN (<hasta batch_size ids>)
+Las tareas borradas se conservan TASK_PURGE_GRACE segundos antes de purgarse.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PurgeJob, Task, TaskArchive
+
+logger = logging.getLogger(__name__)
+
+
+def request_deletion(user):
+    """
+    Desactiva al usuario y encola su borrado. Devuelve el PurgeJob (el que
+    ya estuviera pendiente si se pide dos veces).
+    """
+    with transaction.atomic():
+        if user.is_active:
+            user.is_active = False
+            # post_save descarta el usuario cacheado (tasks.usercache)
+            user.save(update_fields=['is_active'])
+        job, _ = PurgeJob.objects.get_or_create(
+            user_id=user.pk, finished_at=None, defaults={'username': user.username})
+    return job
+
+
+def _delete_batch(queryset, batch_size):
+    """
+    Borra hasta `batch_size` filas de `queryset` y devuelve cuántas borró.
+    """
+    with transaction.atomic():
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        # Sin señales ni relaciones que dependan de estos modelos, delete()
+        # es un único DELETE ... WHERE id IN (...)
+        deleted, _ = queryset.model._base_manager.filter(pk__in=ids).delete()  # pylint: disable=protected-access
+    return deleted
+
+
+def purge_tasks(batch_size, sleep=0.0):
+    """
+    Borra las tareas marcadas hace más de TASK_PURGE_GRACE segundos.
+    Devuelve cuántas borró.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.TASK_PURGE_GRACE)
+    queryset = Task.all_objects.filter(deleted_at__lt=cutoff)
+    total = 0
+    while count := _delete_batch(queryset, batch_size):
+        total += count
+        if sleep:
+            time.sleep(sleep)
+    return total
+
+
+def claim(stale_after):
+    """
+    Toma el PurgeJob pendiente más antiguo que no esté atendiendo otro
+    worker (sin heartbeat o con uno de hace más de `stale_after` segundos).
+    Devuelve None si no hay.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (PurgeJob.objects
+               .filter(Q(heartbeat__isnull=True)
+                       | Q(heartbeat__lt=now - timedelta(seconds=stale_after)),
+                       finished_at__isnull=True)
+               .order_by('requested_at', 'id')
+               .select_for_update(skip_locked=True)
+               .first())
+        if job is not None:
+            job.heartbeat = now
+            job.save(update_fields=['heartbeat'])
+    return job
+
+
+def run(job, batch_size, sleep=0.0):
+    """
+    Borra por lotes las tareas (también las archivadas) del usuario del
+    trabajo y al final el usuario, que ya no arrastra filas en cascada.
+    """
+    if User.objects.filter(pk=job.user_id, is_active=True).exists():
+        # Lo reactivaron antes de que el worker llegara a él
+        job.finished_at = timezone.now()
+        job.error = 'cancelado: el usuario está activo'
+        job.save(update_fields=['finished_at', 'error'])
+        return job
+    for queryset in (Task.all_objects.filter(user_id=job.user_id),
+                     TaskArchive.objects.filter(user_id=job.user_id)):
+        while count := _delete_batch(queryset, batch_size):
+            job.deleted += count
+            job.heartbeat = timezone.now()
+            job.save(update_fields=['deleted', 'heartbeat'])
+            if sleep:
+                time.sleep(sleep)
+    with transaction.atomic():
+        deleted, _ = User.objects.filter(pk=job.user_id).delete()
+        job.deleted += deleted
+        job.finished_at = timezone.now()
+        job.error = ''
+        job.save(update_fields=['deleted', 'finished_at', 'error'])
+    logger.info('purge %s: %s filas', job.username, job.deleted)
+    return job
@@ -0,0 +1,158 @@
+"""
+Búsqueda de texto completo sobre el título y la descripción de las tareas.
+
+Un icontains sobre title/descripcion obliga a recorrer toda la tabla; en su
+lugar cada motor usa su índice de texto completo:
+
+PostgreSQL
+    Columna generada tasks_task.search_vector (tsvector, título con peso A y
+    descripción con peso B, configuración 'spanish') con un índice GIN. Al ser
+    GENERATED ... STORED la BBDD la recalcula en cada INSERT/UPDATE. Se filtra
+    con @@ websearch_to_tsquery() y se ordena con ts_rank().
+
+SQLite
+    Tabla virtual FTS5 tasks_task_fts de contenido externo (no duplica el
+    texto) mantenida por triggers sobre tasks_task. Se filtra con MATCH y se
+    ordena con bm25().
+
+La columna y la tabla virtual no están declaradas en el modelo: las crea la
+migración 0005 con create_index(). Las migraciones que recrean tasks_task en
+SQLite (_remake_table) borran los triggers y deben volver a llamarla.
+
+Uso:
+    from . import search
+    search.search(Task.objects.filter(user=user), 'comprar pan')
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Task
+
+CONFIG = 'spanish'
+
+_TABLE = Task._meta.db_table  # pylint: disable=protected-access
+_FTS_TABLE = f'{_TABLE}_fts'
+
+_POSTGRES_CREATE = [
+    f"""
+    ALTER TABLE {_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{CONFIG}', coalesce(descripcion, '')), 'B')
+    ) STORED
+    """,
+    f'CREATE INDEX IF NOT EXISTS task_search_idx ON {_TABLE} USING GIN (search_vector)',
+]
+_POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS task_search_idx',
+    f'ALTER TABLE {_TABLE} DROP COLUMN IF EXISTS search_vector',
+]
+
+_SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_TABLE} USING fts5(
+        title, descripcion, content='{_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ai AFTER INSERT ON {_TABLE} BEGIN
+        INSERT INTO {_FTS_TABLE}(rowid, title, descripcion)
+        VALUES (new.id, new.title, new.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_ad AFTER DELETE ON {_TABLE} BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, title, descripcion)
+        VALUES ('delete', old.id, old.title, old.descripcion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {_FTS_TABLE}_au AFTER UPDATE OF title, descripcion
+    ON {_TABLE} BEGIN
+        INSERT INTO {_FTS_TABLE}({_FTS_TABLE}, rowid, title, descripcion)
+        VALUES ('delete', old.id, old.title, old.descripcion);
+        INSERT INTO {_FTS_TABLE}(rowid, title, descripcion)
+        VALUES (new.id, new.title, new.descripcion);
+    END
+    """,
+    # Indexa las filas que ya existían
+    f"INSERT INTO {_FTS_TABLE}({_FTS_TABLE}) VALUES ('rebuild')",
+]
+_SQLITE_DROP = [
+    f'DROP TRIGGER IF EXISTS {_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {_FTS_TABLE}',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_index(schema_editor):
+    """
+    Crea el índice de texto completo del motor de la conexión (idempotente).
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, _POSTGRES_CREATE)
+    elif vendor == 'sqlite':
+        _run(schema_editor, _SQLITE_CREATE)
+
+
+def drop_index(schema_editor):
+    """
+    Inversa de create_index().
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, _POSTGRES_DROP)
+    elif vendor == 'sqlite':
+        _run(schema_editor, _SQLITE_DROP)
+
+
+def _fts5_query(query):
+    """
+    Convierte el texto del usuario en una consulta FTS5: cada palabra entre
+    comillas (sin operadores ni sintaxis que pueda dar error) y todas
+    obligatorias, como websearch_to_tsquery sin comillas ni signos.
+    """
+    return ' '.join(f'"{term}"' for term in re.findall(r'\w+', query))
+
+
+def search(queryset, query):
+    """
+    Filtra `queryset` (de Task) a las tareas que contienen `query` y lo
+    ordena por relevancia; cada fila lleva la anotación `rank`.
+    """
+    vendor = connections[queryset.db].vendor
+    column = f'"{_TABLE}"."id"'
+    if vendor == 'postgresql':
+        tsquery = 'websearch_to_tsquery(%s::regconfig, %s)'
+        vector = f'"{_TABLE}"."search_vector"'
+        match = RawSQL(f'{vector} @@ {tsquery}', (CONFIG, query),
+                       output_field=BooleanField())
+        rank = RawSQL(f'ts_rank({vector}, {tsquery})', (CONFIG, query),
+                      output_field=FloatField())
+    elif vendor == 'sqlite':
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return queryset.none()
+        match = RawSQL(
+            f'{column} IN (SELECT rowid FROM {_FTS_TABLE} WHERE {_FTS_TABLE} MATCH %s)',
+            (fts_query,), output_field=BooleanField())
+        # bm25() es más negativo cuanto más relevante; el título pesa el doble
+        rank = RawSQL(
+            f'(SELECT -bm25({_FTS_TABLE}, 2.0, 1.0) FROM {_FTS_TABLE} '
+            f'WHERE {_FTS_TABLE} MATCH %s AND rowid = {column})',
+            (fts_query,), output_field=FloatField())
+    else:
+        # Otros motores: sin índice ni ranking, pero con la misma interfaz
+        return (queryset.filter(Q(title__icontains=query) | Q(descripcion__icontains=query))
+                .annotate(rank=Value(0.0, output_field=FloatField())).order_by('-id'))
+    return queryset.filter(match).annotate(rank=rank).order_by('-rank', '-id')
@@ -0,0 +1,125 @@
+"""
+Mantenimiento de los contadores de TaskStats.
+
+Cada escritura sobre Task informa cómo era la tarea antes y cómo quedó
+después (state()), y record() aplica la diferencia con un único
+    UPDATE tasks_taskstats SET pending = pending + %s, ... WHERE user_id = %s
+Las expresiones F hacen que dos peticiones concurrentes no se pisen.
+
+Si el usuario aún no tiene fila, se crea contando sus tareas (rebuild), lo
+que ya incluye el cambio en curso. manage.py reconcile_task_stats corrige
+cualquier desvío acumulado.
+
+get() y rebuild() leen siempre del primario, también dentro de una vista
+con @read_from_replica: la fila trae la versión de tasks.taskcache, que
+decide qué páginas cacheadas siguen valiendo.
+"""
+from django.db import router
+from django.db.models import Count, F, Q
+
+from .models import Task, TaskArchive, TaskStats
+
+FIELDS = ('pending', 'completed', 'important')
+
+# Agregados equivalentes a los contadores, para rebuild y reconcile
+AGGREGATES = {
+    'pending': Count('id', filter=Q(datecompleted__isnull=True)),
+    'completed': Count('id', filter=Q(datecompleted__isnull=False)),
+    'important': Count('id', filter=Q(datecompleted__isnull=True, important=True)),
+}
+
+
+def state(task):
+    """
+    Lo que aporta una tarea a los contadores: (pendiente, importante).
+    """
+    return (task.datecompleted is None, task.important)
+
+
+def _contribution(task_state):
+    if task_state is None:
+        return {'pending': 0, 'completed': 0, 'important': 0}
+    pending, important = task_state
+    return {'pending': int(pending), 'completed': int(not pending),
+            'important': int(pending and important)}
+
+
+def deltas(before=None, after=None):
+    """
+    Diferencia en los contadores entre dos estados (None = no existe).
+    """
+    old, new = _contribution(before), _contribution(after)
+    return {field: new[field] - old[field] for field in FIELDS}
+
+
+def _updates(changes):
+    return {field: F(field) + value for field, value in changes.items() if value}
+
+
+def adjust(user_id, **changes):
+    """
+    Suma los deltas a los contadores del usuario.
+    """
+    updates = _updates(changes)
+    if updates and not TaskStats.objects.filter(user_id=user_id).update(**updates):
+        rebuild(user_id)
+
+
+async def aadjust(user_id, **changes):
+    """
+    Versión async de adjust().
+    """
+    updates = _updates(changes)
+    if updates and not await TaskStats.objects.filter(user_id=user_id).aupdate(**updates):
+        await aget(user_id)
+
+
+def record(user_id, before=None, after=None):
+    """
+    Registra que una tarea del usuario pasó del estado `before` a `after`.
+    """
+    adjust(user_id, **deltas(before, after))
+
+
+async def arecord(user_id, before=None, after=None):
+    await aadjust(user_id, **deltas(before, after))
+
+
+def _primary():
+    return router.db_for_write(TaskStats)
+
+
+def rebuild(user_id):
+    """
+    Recalcula desde cero los contadores de un usuario. Las tareas archivadas
+    (TaskArchive) cuentan como completadas.
+    """
+    using = _primary()
+    counts = Task.objects.db_manager(using).filter(user_id=user_id).aggregate(**AGGREGATES)
+    counts['completed'] += TaskArchive.objects.using(using).filter(user_id=user_id).count()
+    stats, _ = TaskStats.objects.update_or_create(user_id=user_id, defaults=counts)
+    return stats
+
+
+def get(user_id):
+    """
+    Contadores (y versión) del usuario; si no tiene fila se crea.
+    """
+    return (TaskStats.objects.using(_primary()).filter(user_id=user_id).first()
+            or rebuild(user_id))
+
+
+async def aget(user_id):
+    """
+    Versión async de get().
+    """
+    using = _primary()
+    found = await TaskStats.objects.using(using).filter(user_id=user_id).afirst()
+    if found:
+        return found
+    counts = await Task.objects.db_manager(using).filter(user_id=user_id).aaggregate(
+        **AGGREGATES)
+    counts['completed'] += await TaskArchive.objects.using(using).filter(
+        user_id=user_id).acount()
+    stats, _ = await TaskStats.objects.aupdate_or_create(user_id=user_id, defaults=counts)
+    return stats
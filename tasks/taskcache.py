@@ -0,0 +1,122 @@
+"""
+Cache por usuario de las páginas de list_tasks y completed_tasks.
+
+Cada usuario tiene un número de versión, TaskStats.version. Las páginas se
+guardan bajo una clave que incluye esa versión:
+    tasks:page:<user_id>:<versión>:<estado>:<cursor>
+
+Cuando el usuario crea, edita, completa o borra una tarea se llama a
+bump_version() y todas sus páginas quedan obsoletas de golpe, sin tener que
+buscarlas ni borrarlas: las claves viejas simplemente dejan de pedirse y el
+backend las expulsa por LRU (MAX_ENTRIES en LocMemCache, maxmemory-policy
+allkeys-lru en Redis).
+
+La versión está en la BBDD y no en el cache: con LocMemCache cada worker de
+gunicorn tiene su propio cache, y una versión guardada ahí solo cambiaría en
+el worker que atendió la escritura. Leerla cuesta una consulta por clave
+primaria por petición (for_request() la guarda en la petición), y la misma
+fila trae los contadores de los badges.
+
+Se guardan los datos de las filas (dicts), no el HTML, porque la página
+también muestra los mensajes y datos propios de cada petición.
+
+Las páginas construidas desde una réplica (@read_from_replica) se sirven
+pero no se guardan: la versión sale del primario y la réplica puede ir
+detrás, así que quedarían datos viejos bajo la versión nueva hasta la
+siguiente escritura del usuario.
+"""
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import F
+
+from djangocrud.replicas import reading_from_replica
+
+from . import metrics, stats
+from .models import TaskStats
+
+HITS = 'tasks_list_cache_hits_total'
+MISSES = 'tasks_list_cache_misses_total'
+metrics.register(HITS, 'Páginas de tareas servidas desde el cache.')
+metrics.register(MISSES, 'Páginas de tareas construidas con consultas a la BBDD.')
+
+
+def for_request(request):
+    """
+    TaskStats del usuario de la petición (contadores y versión), leído una
+    sola vez por petición y guardado en request.task_stats.
+    """
+    row = getattr(request, 'task_stats', None)
+    if row is None:
+        row = request.task_stats = stats.get(request.user.pk)
+    return row
+
+
+async def afor_request(request):
+    """
+    Versión async de for_request().
+    """
+    row = getattr(request, 'task_stats', None)
+    if row is None:
+        row = request.task_stats = await stats.aget(request.user.pk)
+    return row
+
+
+def get_version(user_id):
+    """
+    Versión actual de los datos de tareas del usuario.
+    """
+    return stats.get(user_id).version
+
+
+def bump_version(*user_ids):
+    """
+    Invalida todas las páginas cacheadas de los usuarios indicados.
+    Se llama después de cualquier escritura sobre sus tareas. Un usuario sin
+    fila no tiene nada que invalidar: la fila nueva arranca con una versión
+    nunca usada (models.clock_version).
+    """
+    TaskStats.objects.filter(user_id__in=user_ids).update(version=F('version') + 1)
+
+
+async def abump_version(*user_ids):
+    """
+    Versión async de bump_version().
+    """
+    await TaskStats.objects.filter(user_id__in=user_ids).aupdate(version=F('version') + 1)
+
+
+def _page_key(request, version, name):
+    return f'tasks:page:{request.user.pk}:{version}:{name}'
+
+
+def get_or_build(request, name, builder, timeout=DEFAULT_TIMEOUT):
+    """
+    Devuelve el valor cacheado `name` del usuario para su versión actual o lo
+    construye con builder() y lo guarda.
+    """
+    key = _page_key(request, for_request(request).version, name)
+    data = cache.get(key)
+    if data is not None:
+        metrics.incr(HITS)
+        return data
+    metrics.incr(MISSES)
+    data = builder()
+    if not reading_from_replica():
+        cache.set(key, data, timeout)
+    return data
+
+
+async def aget_or_build(request, name, builder, timeout=DEFAULT_TIMEOUT):
+    """
+    Versión async de get_or_build(); builder es una corrutina.
+    """
+    key = _page_key(request, (await afor_request(request)).version, name)
+    data = await cache.aget(key)
+    if data is not None:
+        await metrics.aincr(HITS)
+        return data
+    await metrics.aincr(MISSES)
+    data = await builder()
+    if not reading_from_replica():
+        await cache.aset(key, data, timeout)
+    return data
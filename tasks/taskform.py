@@ -44,6 +44,21 @@ class TaskForm(forms.ModelForm):
                                    )
                                    )
 
+    # Versión de la tarea que se está editando: la edición solo se guarda si
+    # nadie la cambió desde que se abrió el formulario (tasks.writes)
+    version = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
     class Meta:
         model = Task
         fields = ['title', 'descripcion', 'important']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['version'].initial = self.instance.version
+
+    def submitted_version(self):
+        """
+        Versión que envió el cliente; la de la instancia si no envió ninguna.
+        """
+        return self.cleaned_data.get('version') or self.instance.version
@@ -1,3 +1,1344 @@
-from django.test import TestCase
+"""
+Pruebas de la app tasks.
 
-# Create your tests here.
+QueryBudgetTests fija cuántas consultas hace cada URL de djangocrud/urls.py.
+Cada URL se mide con 1 y con 30 tareas en la BBDD: si el número cambia con el
+volumen de datos hay un N+1 y la prueba falla.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.template import engines
+from django.template.backends import django as django_backend
+from django.templatetags.static import static
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from djangocrud import log, middleware as project_middleware, replicas, template_loaders, warmup
+from djangocrud import urls as project_urls
+from djangocrud.middleware import HealthCheckMiddleware, ProfilingMiddleware
+from . import async_views, bloom, dbpool, metrics, purge, stats, throttle, usercache
+from .models import PurgeJob, Task, TaskArchive, TaskStats
+from .pagination import KeysetPaginator, decode_cursor
+
+FAST_HASHER = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# URLConf de AsyncViewsTests: las rutas del proyecto con las vistas async
+# montadas, como en un despliegue con TASKS_ASYNC_VIEWS=1.
+_ASYNC_NAMES = {p.name for p in project_urls.task_urlpatterns(async_views)}
+urlpatterns = [
+    p for p in project_urls.urlpatterns if getattr(p, 'name', None) not in _ASYNC_NAMES
+] + project_urls.task_urlpatterns(async_views)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class QueryBudgetTests(TestCase):
+    """
+    Presupuesto de consultas por URL, independiente del número de tareas.
+    """
+    SIZES = (1, 30)
+
+    def setUp(self):
+        cache.clear()
+        # El admin cachea los ContentType por proceso; se precargan para medir
+        # el estado estable y no la primera petición.
+        ContentType.objects.get_for_model(Task)
+        self.user = User.objects.create_user(
+            'ana', 'ana@example.com', 'secreto123', is_staff=True, is_superuser=True)
+
+    def _seed(self, count):
+        """
+        Reemplaza las tareas del usuario por `count` pendientes y `count`
+        completadas; devuelve una tarea pendiente.
+        """
+        Task.objects.all().delete()
+        now = timezone.now()
+        Task.objects.bulk_create(
+            [Task(title=f'Pendiente {n}', user=self.user) for n in range(count)]
+            + [Task(title=f'Hecha {n}', user=self.user, datecompleted=now)
+               for n in range(count)])
+        stats.rebuild(self.user.pk)
+        return Task.objects.filter(datecompleted__isnull=True).first()
+
+    def assertQueryBudget(self, budget, method, url_factory, data=None, login=True):
+        """
+        Ejecuta la petición con cada tamaño de SIZES y exige exactamente
+        `budget` consultas. url_factory recibe la tarea sembrada.
+        """
+        for size in self.SIZES:
+            with self.subTest(size=size):
+                task = self._seed(size)
+                cache.clear()
+                self.client.logout()
+                if login:
+                    self.client.force_login(self.user)
+                    # Estado estable: sesión y usuario ya en el cache
+                    usercache.CachedModelBackend().get_user(self.user.pk)
+                url = url_factory(task)
+                with self.assertNumQueries(budget):
+                    response = getattr(self.client, method)(url, data or {})
+                self.assertLess(response.status_code, 400)
+
+    def test_home(self):
+        self.assertQueryBudget(0, 'get', lambda task: reverse('home'), login=False)
+
+    def test_signup(self):
+        self.assertQueryBudget(0, 'get', lambda task: reverse('signup'), login=False)
+
+    def test_signup_post(self):
+        data = {'email': 'nuevo@example.com',
+                'password1': 'clave-larga-1', 'password2': 'clave-larga-1'}
+
+        def url(task):
+            # Un usuario nuevo por cada tamaño
+            data['username'] = f'nuevo{task.pk}'
+            return reverse('signup')
+        self.assertQueryBudget(3, 'post', url, data, login=False)
+
+    def test_signin(self):
+        self.assertQueryBudget(0, 'get', lambda task: reverse('signin'), login=False)
+
+    def test_signin_post(self):
+        data = {'username': 'ana', 'password': 'secreto123'}
+        self.assertQueryBudget(9, 'post', lambda task: reverse('signin'), data, login=False)
+
+    def test_list_tasks(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('list_tasks'))
+
+    def test_completed_tasks(self):
+        # Task y TaskArchive
+        self.assertQueryBudget(3, 'get', lambda task: reverse('completed_tasks'))
+
+    def test_search_tasks(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('list_tasks') + '?q=pendiente')
+
+    def test_create_task(self):
+        self.assertQueryBudget(1, 'get', lambda task: reverse('create_task'))
+
+    def test_create_task_post(self):
+        data = {'title': 'Nueva', 'descripcion': 'texto'}
+        self.assertQueryBudget(5, 'post', lambda task: reverse('create_task'), data)
+
+    def test_task_detail(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('task_detail', args=[task.pk]))
+
+    def test_task_detail_post(self):
+        data = {'title': 'Editada', 'descripcion': 'texto', 'important': 'on'}
+        self.assertQueryBudget(
+            6, 'post', lambda task: reverse('task_detail', args=[task.pk]), data)
+
+    def test_complete_task(self):
+        # UPDATE ... RETURNING sin SELECT previo
+        self.assertQueryBudget(
+            5, 'post', lambda task: reverse('complete_task', args=[task.pk]))
+
+    def test_remove_task(self):
+        self.assertQueryBudget(
+            6, 'post', lambda task: reverse('remove_task', args=[task.pk]))
+
+    def test_bulk_tasks(self):
+        self.assertQueryBudget(
+            6, 'post', lambda task: reverse('bulk_tasks'),
+            {'action': 'complete', 'ids': list(range(1, 200))})
+
+    def test_logout(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('logout'))
+
+    def test_metrics(self):
+        self.assertQueryBudget(0, 'get', lambda task: reverse('metrics'))
+
+    def test_api_tasks(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('api_tasks'))
+
+    def test_api_task(self):
+        self.assertQueryBudget(2, 'get', lambda task: reverse('api_task', args=[task.pk]))
+
+    def test_api_task_complete(self):
+        self.assertQueryBudget(
+            6, 'post', lambda task: reverse('api_task_complete', args=[task.pk]))
+
+    def test_admin_index(self):
+        self.assertQueryBudget(1, 'get', lambda task: reverse('admin:index'))
+
+    def test_admin_task_changelist(self):
+        self.assertQueryBudget(
+            3, 'get', lambda task: reverse('admin:tasks_task_changelist'))
+
+    def test_admin_task_change(self):
+        self.assertQueryBudget(
+            2, 'get', lambda task: reverse('admin:tasks_task_change', args=[task.pk]))
+
+
+class BulkTasksTests(TestCase):
+    """
+    Acciones masivas desde la lista de tareas.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.other = User.objects.create_user('beto', password='secreto123')
+        self.mine = Task.objects.bulk_create(
+            [Task(title=f'Mia {n}', user=self.user) for n in range(3)])
+        self.theirs = Task.objects.create(title='Ajena', user=self.other)
+        self.client.force_login(self.user)
+
+    def post(self, action, tasks):
+        return self.client.post(reverse('bulk_tasks'), {
+            'action': action, 'ids': [task.pk for task in tasks]}, follow=True)
+
+    def test_complete_only_touches_own_tasks(self):
+        response = self.post('complete', self.mine + [self.theirs])
+        self.assertContains(response, '3 tarea(s) completadas')
+        self.assertFalse(Task.objects.filter(
+            user=self.user, datecompleted__isnull=True).exists())
+        self.theirs.refresh_from_db()
+        self.assertIsNone(self.theirs.datecompleted)
+
+    def test_toggle_important(self):
+        Task.objects.filter(pk=self.mine[0].pk).update(important=True)
+        self.post('toggle_important', self.mine[:2])
+        self.assertEqual(
+            list(Task.objects.filter(user=self.user).order_by('pk')
+                 .values_list('important', flat=True)),
+            [False, True, False])
+
+    def test_delete(self):
+        response = self.post('delete', self.mine[:2] + [self.theirs])
+        self.assertContains(response, '2 tarea(s) eliminadas')
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(Task.objects.filter(pk=self.theirs.pk).exists())
+
+    def test_invalid_action(self):
+        response = self.post('drop_table', self.mine)
+        self.assertContains(response, 'Acción no válida')
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 3)
+
+    def test_non_decimal_ids_are_ignored(self):
+        response = self.client.post(reverse('bulk_tasks'), {
+            'action': 'delete', 'ids': ['²', '-1', 'x', str(self.mine[0].pk)]}, follow=True)
+        self.assertContains(response, '1 tarea(s) eliminadas')
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class UserCacheTests(TestCase):
+    """
+    tasks.usercache: sesión y usuario desde el cache, con invalidación.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.client.force_login(self.user)
+        self.client.get(reverse('create_task'))
+
+    def test_user_served_from_cache(self):
+        # Solo la fila de TaskStats (badges y versión del cache de tareas)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('create_task'))
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_is_active_change_logs_out(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('create_task'))
+        self.assertRedirects(response, f"{reverse('signin')}?next={reverse('create_task')}")
+
+    def test_password_change_ends_other_sessions(self):
+        self.user.set_password('otra-clave')
+        self.user.save()
+        response = self.client.get(reverse('create_task'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_late_write_after_invalidation_is_ignored(self):
+        # Un get_user() que leyó la BBDD antes del save() y guarda después
+        stale = User.objects.get(pk=self.user.pk)
+        generation = cache.get(f'auth:user:gen:{self.user.pk}')
+        self.user.is_active = False
+        self.user.save()
+        cache.set(f'auth:user:{self.user.pk}', (generation, stale))
+        self.assertIsNone(usercache.CachedModelBackend().get_user(self.user.pk))
+
+    def test_logout_drops_cached_user(self):
+        key = f'auth:user:{self.user.pk}'
+        self.assertIsNotNone(cache.get(key))
+        self.client.get(reverse('logout'))
+        self.assertIsNone(cache.get(key))
+
+
+class LoggingTests(TestCase):
+    """
+    djangocrud.log: cola, muestreo de SQL y formato JSON.
+    """
+
+    def record(self, msg='hola %s', args=('mundo',), **extra):
+        record = logging.LogRecord('tasks', logging.INFO, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_parse_levels(self):
+        self.assertEqual(log.parse_levels(' django.db.backends=debug, tasks=INFO,'),
+                         {'django.db.backends': 'DEBUG', 'tasks': 'INFO'})
+
+    def test_json_formatter_includes_extra(self):
+        data = json.loads(log.JsonFormatter().format(self.record(profile={'queries': 3})))
+        self.assertEqual(data['message'], 'hola mundo')
+        self.assertEqual(data['level'], 'INFO')
+        self.assertEqual(data['profile'], {'queries': 3})
+
+    def test_rate_limit_counts_dropped(self):
+        limiter = log.RateLimitFilter(rate=1000, burst=2)
+        passed = [limiter.filter(self.record()) for _ in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        limiter.tokens = 1
+        record = self.record()
+        self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.sampled_dropped, 3)
+        self.assertFalse(log.RateLimitFilter(rate=0).filter(self.record()))
+
+    def test_queue_handler_writes_from_listener(self):
+        stream = io.StringIO()
+        handler = log.QueueHandler(stream)
+        self.addCleanup(handler.close)
+        handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        handler.handle(self.record())
+        handler.flush()
+        self.assertEqual(stream.getvalue(), 'INFO hola mundo\n')
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER, LOGIN_THROTTLE={
+    'ip': {'burst': 4, 'per_minute': 1}, 'username': {'burst': 2, 'per_minute': 1},
+    'backoff': 10, 'backoff_max': 60, 'ip_header': 'REMOTE_ADDR'})
+class LoginThrottleTests(TestCase):
+    """
+    tasks.throttle delante de CustomLoginView.
+    """
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user('ana', password='secreto123')
+
+    def login(self, username='ana', password='mala', ip='10.0.0.1'):
+        return self.client.post(reverse('signin'), {'username': username, 'password': password},
+                                REMOTE_ADDR=ip)
+
+    def test_rejects_before_authenticating(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '10')
+        self.assertContains(response, 'Demasiados intentos', status_code=429)
+        self.assertEqual(metrics.value(throttle.SHED['username']), 1)
+        # Bloqueado también con la contraseña correcta, y el bloqueo crece
+        self.assertEqual(self.login(password='secreto123').status_code, 429)
+
+    def test_ip_bucket_covers_all_usernames(self):
+        for n in range(4):
+            self.assertEqual(self.login(username=f'user{n}').status_code, 200)
+        self.assertEqual(self.login(username='otro').status_code, 429)
+        self.assertEqual(self.login(username='otro', ip='10.0.0.2').status_code, 200)
+        self.assertEqual(metrics.value(throttle.SHED['ip']), 1)
+
+    def test_backoff_doubles(self):
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.3')
+        self.assertIsNone(throttle.check(request, 'ana'))
+        self.assertIsNone(throttle.check(request, 'ana'))
+        self.assertEqual(throttle.check(request, 'ana'), 10)
+        cache.set(throttle._username_key('ana'),  # pylint: disable=protected-access
+                  {'tokens': 0, 'updated': time.time(), 'strikes': 1, 'until': 0})
+        self.assertEqual(throttle.check(request, 'ana'), 20)
+
+    def test_successful_login_resets_username(self):
+        self.login()
+        self.assertRedirects(self.login(password='secreto123'), reverse('list_tasks'),
+                             fetch_redirect_response=False)
+        self.client.logout()
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login().status_code, 200)
+
+
+class SignupTests(TestCase):
+    """
+    Alta apoyada en la restricción UNIQUE y consulta de disponibilidad con
+    el filtro de Bloom.
+    """
+
+    def setUp(self):
+        bloom.clear()
+        User.objects.create_user('ana')
+
+    def check(self, username):
+        return self.client.get(reverse('check_username'), {'username': username}).json()
+
+    def test_duplicate_username_is_a_form_error(self):
+        response = self.client.post(reverse('signup'), {
+            'username': 'ana', 'email': 'ana@example.com',
+            'password1': 'clave-larga-1', 'password2': 'clave-larga-1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'username',
+                             'Username << ana >> already exists!')
+        self.assertEqual(User.objects.filter(username='ana').count(), 1)
+
+    def test_available_answered_from_bloom_filter(self):
+        self.check('calentar')
+        with self.assertNumQueries(0):
+            self.assertTrue(self.check('libre')['available'])
+        with self.assertNumQueries(1):
+            self.assertFalse(self.check('ana')['available'])
+        self.assertIn('error', self.check('con espacios'))
+
+    def test_new_signup_is_added_to_filter(self):
+        self.check('calentar')
+        self.client.post(reverse('signup'), {
+            'username': 'beto', 'email': 'beto@example.com',
+            'password1': 'clave-larga-1', 'password2': 'clave-larga-1'})
+        self.assertTrue(bloom.might_exist('beto'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom_filter = bloom.BloomFilter(1000, 0.01)
+        names = [f'user{n}' for n in range(1000)]
+        for name in names:
+            bloom_filter.add(name)
+        self.assertTrue(all(name in bloom_filter for name in names))
+        false_positives = sum(f'other{n}' in bloom_filter for n in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    tasks.pagination.KeysetPaginator: recorrido completo y uso del índice.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        now = timezone.now()
+        # Mitad con el mismo created, para que el desempate por id cuente
+        Task.objects.bulk_create([
+            Task(title=f'T{n}', user=self.user,
+                 created=now if n % 2 else now - timedelta(minutes=n))
+            for n in range(25)])
+        self.listtask = Task.objects.filter(user=self.user, datecompleted__isnull=True)
+
+    def paginator(self):
+        return KeysetPaginator(self.listtask.values('id', 'created'), 'created', page_size=4)
+
+    def test_walks_every_row_once_in_both_directions(self):
+        expected = list(self.listtask.order_by('created', 'id').values_list('id', flat=True))
+        seen, page = [], self.paginator().page()
+        pages = [page]
+        while True:
+            seen += [row['id'] for row in page.object_list]
+            if not page.has_next:
+                break
+            page = self.paginator().page(after=page.next_cursor)
+            pages.append(page)
+        self.assertEqual(seen, expected)
+        back = self.paginator().page(before=pages[-1].previous_cursor)
+        self.assertEqual(back.object_list, pages[-2].object_list)
+
+    def test_seek_is_an_index_range(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('el plan esperado es el de SQLite')
+        page = self.paginator().page()
+        cursor = decode_cursor(page.next_cursor)
+        queryset = self.listtask.filter(
+            self.paginator()._seek(cursor, reverse=False))  # pylint: disable=protected-access
+        self.assertIn('task_pending_user_idx (user_id=? AND created>?)', queryset.explain())
+        self.assertIn('"created" >=', str(queryset.query))
+
+
+class SearchTests(TestCase):
+    """
+    Búsqueda de texto completo (tasks.search) en las listas con ?q=.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+        Task.objects.create(title='Comprar pan', descripcion='y leche', user=self.user)
+        Task.objects.create(title='Llamar', descripcion='comprar regalo', user=self.user)
+        Task.objects.create(title='Canción', descripcion='', user=self.user)
+        Task.objects.create(title='Comprar pan', user=User.objects.create_user('beto'))
+        self.client.force_login(self.user)
+
+    def titles(self, url, query):
+        response = self.client.get(url, {'q': query})
+        return [task['title'] for task in response.context['tasks']]
+
+    def test_ranked_and_scoped_to_user(self):
+        # El título pesa más que la descripción
+        self.assertEqual(self.titles(reverse('list_tasks'), 'comprar'),
+                         ['Comprar pan', 'Llamar'])
+        self.assertEqual(self.titles(reverse('list_tasks'), 'comprar leche'), ['Comprar pan'])
+
+    def test_index_follows_writes(self):
+        task = Task.objects.get(title='Llamar')
+        task.title = 'Pagar cuentas'
+        task.save()
+        self.assertEqual(self.titles(reverse('list_tasks'), 'pagar'), ['Pagar cuentas'])
+        Task.objects.filter(title='Comprar pan', user=self.user).update(
+            datecompleted=timezone.now())
+        self.assertEqual(self.titles(reverse('completed_tasks'), 'pan'), ['Comprar pan'])
+        task.delete()
+        self.assertEqual(self.titles(reverse('list_tasks'), 'pagar'), [])
+
+    def test_accents_and_syntax(self):
+        self.assertEqual(self.titles(reverse('list_tasks'), 'cancion'), ['Canción'])
+        self.assertEqual(self.titles(reverse('list_tasks'), 'pan*) "'), ['Comprar pan'])
+        self.assertEqual(self.titles(reverse('list_tasks'), '!!'), [])
+
+
+class ExportTests(TestCase):
+    """
+    Exportación en streaming: una consulta sobre tasks_task y otra sobre
+    tasks_taskarchive sin importar el número de filas.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana', password='secreto123')
+        Task.objects.bulk_create(
+            [Task(title=f'Tarea {n}', descripcion='a,b', user=self.user) for n in range(50)])
+        Task.objects.create(title='Ajena', user=User.objects.create_user('beto'))
+        self.client.force_login(self.user)
+
+    def _download(self, queries=2, **params):
+        response = self.client.get(reverse('export_tasks'), params)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(queries):
+            return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self._download(format='csv').decode())))
+        self.assertEqual(rows[0][:2], ['id', 'title'])
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(rows[1][2], 'a,b')
+
+    def test_ndjson_gzip(self):
+        content = gzip.decompress(self._download(format='ndjson', gzip='1'))
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(len(rows), 50)
+        self.assertNotIn('Ajena', {row['title'] for row in rows})
+
+    def test_archived_tasks_are_exported_as_completed(self):
+        now = timezone.now()
+        Task.objects.filter(title='Tarea 1').update(datecompleted=now)
+        TaskArchive.objects.create(id=Task.objects.get(title='Tarea 0').pk, title='Archivada',
+                                   created=now, datecompleted=now, user=self.user)
+        Task.objects.filter(title='Tarea 0').delete()
+
+        def titles(status, queries=2):
+            content = self._download(queries, format='ndjson', status=status)
+            return [json.loads(line)['title'] for line in content.decode().splitlines()]
+
+        self.assertEqual(titles('completed'), ['Archivada', 'Tarea 1'])
+        self.assertEqual(titles('all')[:3], ['Archivada', 'Tarea 1', 'Tarea 2'])
+        self.assertNotIn('Archivada', titles('pending', queries=1))
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('export_tasks'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskStatsTests(TestCase):
+    """
+    Contadores denormalizados de TaskStats.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana')
+        self.client.force_login(self.user)
+
+    def counts(self):
+        row = TaskStats.objects.get(user=self.user)
+        return {field: getattr(row, field) for field in stats.FIELDS}
+
+    def test_cache_version_is_shared_through_the_database(self):
+        self.client.get(reverse('list_tasks'))
+        # Otro worker: su propio LocMemCache, la misma BBDD
+        with self.settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'otro-worker'}}):
+            self.client.post(reverse('create_task'), {'title': 'Nueva', 'descripcion': 'd'})
+        titles = [task['title'] for task in
+                  self.client.get(reverse('list_tasks')).context['tasks']]
+        self.assertEqual(titles, ['Nueva'])
+
+    def test_views_keep_counters_in_sync(self):
+        for n in range(3):
+            self.client.post(reverse('create_task'),
+                             {'title': f'T{n}', 'descripcion': 'd', 'important': 'on'})
+        self.assertEqual(self.counts(), {'pending': 3, 'completed': 0, 'important': 3})
+        first, second, third = Task.objects.filter(user=self.user)
+        self.client.post(reverse('complete_task', args=[first.pk]))
+        self.client.post(reverse('task_detail', args=[second.pk]),
+                         {'title': 'T1', 'descripcion': 'd'})
+        self.client.post(reverse('remove_task', args=[third.pk]))
+        self.assertEqual(self.counts(), {'pending': 1, 'completed': 1, 'important': 0})
+        self.client.post(reverse('bulk_tasks'), {'action': 'toggle_important',
+                                                  'ids': [first.pk, second.pk]})
+        self.assertEqual(self.counts(), {'pending': 1, 'completed': 1, 'important': 1})
+
+    def test_badges_in_navbar(self):
+        Task.objects.create(title='Pendiente', user=self.user)
+        response = self.client.get(reverse('list_tasks'))
+        self.assertEqual(response.context['task_stats'].pending, 1)
+
+    def test_reconcile_fixes_drift(self):
+        Task.objects.bulk_create([Task(title=f'T{n}', user=self.user) for n in range(4)])
+        TaskStats.objects.create(user=self.user, pending=1, completed=2, important=0)
+        other = User.objects.create_user('beto')
+        Task.objects.create(title='Ajena', user=other, datecompleted=timezone.now())
+
+        stdout = io.StringIO()
+        call_command('reconcile_task_stats', '--dry-run', stdout=stdout)
+        self.assertIn('1 con desvío y 1 sin fila', stdout.getvalue())
+        self.assertEqual(self.counts()['pending'], 1)
+
+        call_command('reconcile_task_stats', '--batch-size', '1', stdout=io.StringIO())
+        self.assertEqual(self.counts(), {'pending': 4, 'completed': 0, 'important': 0})
+        self.assertEqual(TaskStats.objects.get(user=other).completed, 1)
+
+
+@override_settings(TASKS_PAGE_SIZE=3)
+class ArchiveTests(TestCase):
+    """
+    archive_tasks y la paginación de completed_tasks sobre Task + TaskArchive.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana')
+        now = timezone.now()
+        # Días desde que se completó: las de 40+ días se archivan
+        self.tasks = Task.objects.bulk_create([
+            Task(title=f'Hecha {days}', user=self.user, datecompleted=now - timedelta(days=days))
+            for days in (1, 40, 2, 50, 3, 60, 70)])
+        Task.objects.create(title='Pendiente', user=self.user)
+        stats.rebuild(self.user.pk)
+        self.client.force_login(self.user)
+
+    def titles(self, response):
+        return [task['title'] for task in response.context['tasks']]
+
+    def test_moves_old_completed_tasks_in_batches(self):
+        stdout = io.StringIO()
+        call_command('archive_tasks', '--older-than', '30', '--batch-size', '3', stdout=stdout)
+        self.assertIn('4 tareas archivadas en 2 lotes', stdout.getvalue())
+        self.assertEqual(sorted(TaskArchive.objects.values_list('title', flat=True)),
+                         ['Hecha 40', 'Hecha 50', 'Hecha 60', 'Hecha 70'])
+        self.assertEqual(Task.objects.count(), 4)
+        archived = TaskArchive.objects.get(title='Hecha 40')
+        self.assertEqual(archived.pk, self.tasks[1].pk)
+        # Siguen contando como completadas, también al recalcular
+        self.assertEqual(stats.get(self.user.pk).completed, 7)
+        self.assertEqual(stats.rebuild(self.user.pk).completed, 7)
+
+    def test_completed_pages_continue_into_archive(self):
+        Task.objects.filter(title='Hecha 2').update(
+            datecompleted=timezone.now() - timedelta(days=45))
+        call_command('archive_tasks', '--older-than', '30', stdout=io.StringIO())
+        # 'Hecha 3' quedó en Task pero es más antigua que una archivada
+        Task.objects.filter(title='Hecha 3').update(
+            datecompleted=timezone.now() - timedelta(days=55))
+        cache.clear()
+        response = self.client.get(reverse('completed_tasks'))
+        self.assertEqual(self.titles(response), ['Hecha 1', 'Hecha 40', 'Hecha 2'])
+        response = self.client.get(reverse('completed_tasks'),
+                                   {'after': response.context['page'].next_cursor})
+        self.assertEqual(self.titles(response), ['Hecha 50', 'Hecha 3', 'Hecha 60'])
+        self.assertContains(response, 'Archivada')
+        self.assertNotContains(response, reverse('task_detail', args=[self.tasks[3].pk]))
+        page = response.context['page']
+        response = self.client.get(reverse('completed_tasks'), {'after': page.next_cursor})
+        self.assertEqual(self.titles(response), ['Hecha 70'])
+        response = self.client.get(reverse('completed_tasks'), {'before': page.previous_cursor})
+        self.assertEqual(self.titles(response), ['Hecha 1', 'Hecha 40', 'Hecha 2'])
+
+    def test_dry_run(self):
+        stdout = io.StringIO()
+        call_command('archive_tasks', '--older-than', '30', '--dry-run', stdout=stdout)
+        self.assertIn('4 tareas', stdout.getvalue())
+        self.assertFalse(TaskArchive.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class PurgeTests(TestCase):
+    """
+    Borrado lógico de tareas y usuarios, y manage.py purge_worker.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.tasks = Task.objects.bulk_create(
+            [Task(title=f'Tarea {n}', user=self.user) for n in range(5)])
+        TaskArchive.objects.create(id=10_000, title='Vieja', user=self.user,
+                                   created=timezone.now(), datecompleted=timezone.now())
+
+    def purge(self, *args):
+        call_command('purge_worker', '--once', '--batch-size', '2', *args, stdout=io.StringIO())
+
+    def test_removed_task_is_hidden_until_purged(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse('remove_task', args=[self.tasks[0].pk]))
+        self.assertFalse(Task.objects.filter(pk=self.tasks[0].pk).exists())
+        self.assertIsNotNone(Task.all_objects.get(pk=self.tasks[0].pk).deleted_at)
+        self.assertEqual(stats.get(self.user.pk).pending, 4)
+
+        self.purge()
+        self.assertTrue(Task.all_objects.filter(pk=self.tasks[0].pk).exists())
+        with self.settings(TASK_PURGE_GRACE=0):
+            self.purge()
+        self.assertFalse(Task.all_objects.filter(pk=self.tasks[0].pk).exists())
+        self.assertEqual(Task.objects.count(), 4)
+
+    def test_admin_delete_defers_to_worker(self):
+        admin = User.objects.create_superuser('root', password='secreto123')
+        user_client = self.client_class()
+        user_client.force_login(self.user)
+        self.client.force_login(admin)
+
+        response = self.client.post(
+            reverse('admin:auth_user_delete', args=[self.user.pk]), {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+        # Las sesiones abiertas del usuario dejan de valer al momento
+        self.assertEqual(user_client.get(reverse('list_tasks')).status_code, 302)
+
+        self.purge()
+        job = PurgeJob.objects.get(user_id=self.user.pk)
+        self.assertIsNotNone(job.finished_at)
+        self.assertGreaterEqual(job.deleted, 7)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Task.all_objects.exists())
+        self.assertFalse(TaskArchive.objects.exists())
+
+    def test_admin_delete_needs_task_delete_permission(self):
+        staff = User.objects.create_user('staff', password='secreto123', is_staff=True)
+        staff.user_permissions.set(Permission.objects.filter(
+            content_type__app_label='auth', codename__in=['view_user', 'delete_user']))
+        self.client.force_login(staff)
+        url = reverse('admin:auth_user_delete', args=[self.user.pk])
+
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        self.assertFalse(PurgeJob.objects.exists())
+
+        staff.user_permissions.add(Permission.objects.get(codename='delete_task'))
+        self.client.force_login(User.objects.get(pk=staff.pk))
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 302)
+
+    def test_reactivated_user_is_not_purged(self):
+        purge.request_deletion(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.purge()
+        job = PurgeJob.objects.get(user_id=self.user.pk)
+        self.assertIn('cancelado', job.error)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+
+    def test_stale_job_is_reclaimed(self):
+        job = purge.request_deletion(self.user)
+        self.assertEqual(purge.claim(stale_after=600), job)
+        self.assertIsNone(purge.claim(stale_after=600))
+        self.assertEqual(purge.claim(stale_after=0), job)
+
+
+class StaticFilesTests(TestCase):
+    """
+    collectstatic con el manifest comprimido, WhiteNoise y check_static.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root.name,
+            STORAGES={**settings.STORAGES, 'staticfiles': {
+                'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'}})
+        cls.static_settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.static_settings.disable()
+        cls.static_root.cleanup()
+        super().tearDownClass()
+
+    def test_hashed_files_are_immutable_and_precompressed(self):
+        url = static('customerrors/css/styles.css')
+        self.assertRegex(url, r'styles\.[0-9a-f]{12}\.css$')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('immutable', response['Cache-Control'])
+        # WhiteNoise responde antes de SessionMiddleware
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        response.close()
+
+    def test_check_static_passes_after_collectstatic(self):
+        stdout = io.StringIO()
+        call_command('check_static', stdout=stdout)
+        self.assertRegex(stdout.getvalue(), r'[1-9]\d* referencias a estáticos verificadas')
+
+    def test_check_static_reports_missing_reference(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'roto.html'), 'w', encoding='utf-8') as file:
+                file.write("{% load static %}<link href=\"{% static 'css/no-existe.css' %}\">")
+            templates = [{**settings.TEMPLATES[0], 'DIRS': [directory]}]
+            with self.settings(TEMPLATES=templates), self.assertRaises(CommandError):
+                call_command('check_static', stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class TemplateTests(TestCase):
+    """
+    Loaders de plantillas, cache de la barra de navegación y bench_templates.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_minify_keeps_line_breaks_and_preformatted_text(self):
+        source = '<ul>\n    <li>a</li>   \n\n    <li>b</li>\n</ul>\n<pre>\n  x\n    y</pre>\n'
+        self.assertEqual(template_loaders.minify(source),
+                         '<ul>\n<li>a</li>\n<li>b</li>\n</ul>\n<pre>\n  x\n    y</pre>\n')
+
+    def test_pages_are_minified_without_stray_wrappers(self):
+        for response in (self.client.get(reverse('home')),
+                         self.client.get(reverse('task_detail', args=[1]), follow=True)):
+            html = response.content.decode()
+            self.assertEqual(html.count('<html'), 1)
+            self.assertNotIn('\n  ', html)
+
+    def test_navbar_fragment_per_user_and_version(self):
+        ana = User.objects.create_user('ana')
+        beto = User.objects.create_user('beto')
+        self.client.force_login(ana)
+        self.assertContains(self.client.get(reverse('list_tasks')), '0 pending')
+        self.client.post(reverse('create_task'), {'title': 'Nueva', 'descripcion': 'texto'})
+        response = self.client.get(reverse('list_tasks'))
+        self.assertContains(response, '1 pending')
+        self.assertContains(response, 'Bienvenido, ana')
+        self.client.force_login(beto)
+        response = self.client.get(reverse('list_tasks'))
+        self.assertContains(response, 'Bienvenido, beto')
+        self.assertContains(response, '0 pending')
+
+    def test_bench_templates(self):
+        stdout = io.StringIO()
+        call_command('bench_templates', '--rows', '5', '--iterations', '2',
+                     stdout=stdout, stderr=io.StringIO())
+        results = json.loads(stdout.getvalue())['results']
+        rows = results['tasks/tasks.html']
+        self.assertLess(rows['configured']['bytes'], rows['plain']['bytes'])
+        self.assertEqual(set(results), {
+            'tasks/home.html', 'tasks/signin.html', 'tasks/signup.html',
+            'tasks/create_task.html', 'tasks/task_detail.html', 'tasks/tasks.html',
+            'customerrors/404.html', 'customerrors/500.html'})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class ConcurrentWritesTests(TestCase):
+    """
+    complete como UPDATE condicionado y ediciones con versión (tasks.writes).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.task = Task.objects.create(title='Pendiente', descripcion='x', user=self.user,
+                                        important=True)
+        stats.rebuild(self.user.pk)
+        self.client.force_login(self.user)
+
+    def test_second_complete_changes_nothing(self):
+        url = reverse('complete_task', args=[self.task.pk])
+        self.client.post(url)
+        self.task.refresh_from_db()
+        completed_at = self.task.datecompleted
+        self.assertEqual((self.task.version, stats.get(self.user.pk).important), (2, 0))
+
+        response = self.client.post(url, follow=True)
+        self.assertContains(response, 'ya estaba completada')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.datecompleted, completed_at)
+        self.assertEqual(stats.get(self.user.pk).completed, 1)
+
+    def test_complete_requires_owner_and_post(self):
+        other = User.objects.create_user('beto')
+        theirs = Task.objects.create(title='Ajena', user=other)
+        self.assertEqual(
+            self.client.post(reverse('complete_task', args=[theirs.pk])).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse('complete_task', args=[self.task.pk])).status_code, 405)
+        theirs.refresh_from_db()
+        self.assertIsNone(theirs.datecompleted)
+
+    def test_stale_edit_is_rejected(self):
+        url = reverse('task_detail', args=[self.task.pk])
+        form = self.client.get(url).context['form']
+        self.assertEqual(form['version'].value(), 1)
+        # Otra pestaña guarda primero
+        self.client.post(url, {'title': 'Primera', 'descripcion': 'x', 'important': 'on',
+                               'version': 1})
+        response = self.client.post(url, {'title': 'Segunda', 'descripcion': 'x',
+                                          'version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'Primera', status_code=409)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.important, self.task.version),
+                         ('Primera', True, 2))
+
+    def test_edit_writes_only_changed_fields(self):
+        url = reverse('task_detail', args=[self.task.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'title': 'Editada', 'descripcion': 'x',
+                                              'version': 1})
+        self.assertEqual(response.status_code, 302)
+        [update] = [query['sql'] for query in queries
+                    if query['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertIn('"title"', update)
+        self.assertNotIn('"descripcion"', update)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.important, self.task.version),
+                         ('Editada', False, 2))
+        self.assertEqual(stats.get(self.user.pk).important, 0)
+
+    def test_api_conflicts(self):
+        url = reverse('api_task', args=[self.task.pk])
+        self.assertEqual(self.client.get(url).json()['version'], 1)
+        response = self.client.patch(url, {'title': 'API', 'version': 1},
+                                     content_type='application/json')
+        self.assertEqual(response.json()['version'], 2)
+        response = self.client.patch(url, {'title': 'Vieja', 'version': 1},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['current']['title'], 'API')
+
+        complete = reverse('api_task_complete', args=[self.task.pk])
+        self.assertEqual(self.client.post(complete).status_code, 200)
+        self.assertEqual(self.client.post(complete).status_code, 409)
+
+
+# Alias de réplica solo para los tests. Tiene que existir al importar el
+# módulo: el runner crea las BBDD de prueba de los alias que declaran los
+# tests en `databases`, y esta queda como otra SQLite en memoria
+connections.settings.setdefault('replica', {
+    **connections.settings['default'], 'NAME': 'replica',
+    'TEST': {**connections.settings['default']['TEST'], 'NAME': None}})
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """
+    djangocrud.replicas con dos SQLite: 'default' como primario y 'replica'
+    con datos distintos, para saber de cuál leyó cada vista.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana')
+        Task.objects.create(title='En primario', user=self.user)
+        User.objects.db_manager('replica').create(pk=self.user.pk, username='ana')
+        Task.objects.db_manager('replica').create(title='En réplica', user_id=self.user.pk)
+        self.client.force_login(self.user)
+
+    def titles(self):
+        response = self.client.get(reverse('list_tasks'))
+        return [task['title'] for task in response.context['tasks']]
+
+    def test_list_reads_from_replica(self):
+        self.assertEqual(self.titles(), ['En réplica'])
+        with self.settings(DATABASE_REPLICAS=[]):
+            cache.clear()
+            self.assertEqual(self.titles(), ['En primario'])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        response = self.client.post(reverse('create_task'),
+                                    {'title': 'Nueva', 'descripcion': 'x'})
+        self.assertIn(replicas.STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.titles(), ['En primario', 'Nueva'])
+
+        self.client.cookies[replicas.STICKY_COOKIE] = str(time.time() - 1)
+        cache.clear()
+        self.assertEqual(self.titles(), ['En réplica'])
+
+    def test_detail_post_and_writes_use_primary(self):
+        task = Task.objects.get(title='En primario')
+        url = reverse('task_detail', args=[task.pk])
+        # Mismo id en las dos BBDD: el GET muestra la copia de la réplica
+        self.assertContains(self.client.get(url), 'En réplica')
+        response = self.client.post(url, {'title': 'Editada', 'descripcion': 'x',
+                                          'version': 1})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Task.objects.filter(title='Editada').exists())
+        self.assertFalse(Task.objects.using('replica').filter(title='Editada').exists())
+
+    def test_replica_pages_are_not_cached(self):
+        self.assertEqual(self.titles(), ['En réplica'])
+        # La réplica se pone al día; sin nada cacheado se ve en la próxima lectura
+        Task.objects.db_manager('replica').create(title='Replicada', user_id=self.user.pk)
+        self.assertEqual(self.titles(), ['En réplica', 'Replicada'])
+        # Una lectura del primario sí se guarda
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.titles(), ['En primario'])
+            Task.objects.db_manager('default').filter(user=self.user).update(title='Cambiada')
+            self.assertEqual(self.titles(), ['En primario'])
+
+    async def test_stickiness_in_async_chain(self):
+        async def get_response(request):  # pylint: disable=unused-argument
+            return HttpResponse('ok')
+
+        middleware = replicas.PrimaryStickinessMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().post('/'))
+        self.assertIn(replicas.STICKY_COOKIE, response.cookies)
+        response = await middleware(RequestFactory().get('/'))
+        self.assertNotIn(replicas.STICKY_COOKIE, response.cookies)
+
+    def test_router_outside_marked_views(self):
+        router = replicas.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Task))
+        self.assertEqual(router.db_for_write(Task), 'default')
+
+
+class DbPoolTests(TestCase):
+    """
+    Gauges de tasks.dbpool. Los tests corren en SQLite, sin pool: los
+    valores se calculan sobre un get_stats() de psycopg_pool de ejemplo.
+    """
+    STATS = {'pool_min': 2, 'pool_max': 4, 'pool_size': 4, 'pool_available': 1,
+             'requests_waiting': 3, 'requests_num': 50, 'requests_wait_ms': 1500}
+
+    def test_gauges_from_pool_stats(self):
+        values = {name: func(self.STATS) for name, (_, func) in dbpool.GAUGES.items()}
+        self.assertEqual(values, {'connections': 4, 'in_use': 3, 'waiting': 3,
+                                  'wait_seconds': 1.5, 'timeouts': 0})
+
+    def test_without_pool(self):
+        self.assertEqual(dbpool.pooled_aliases(), [])
+        self.assertIsNone(dbpool.stats('default'))
+        gauge = dbpool._gauge('default', dbpool.GAUGES['in_use'][1])  # pylint: disable=protected-access
+        self.assertIsNone(gauge())
+        self.assertNotIn('db_pool_', metrics.render())
+
+
+class WarmupTests(TestCase):
+    """
+    djangocrud.warmup y las sondas /healthz y /readyz.
+    """
+
+    def setUp(self):
+        self.addCleanup(warmup.READY.clear)
+
+    def test_resolve_urls(self):
+        self.assertGreaterEqual(warmup.resolve_urls(), len(project_urls.urlpatterns))
+
+    def test_compile_templates_fills_cached_loader(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        self.assertGreater(warmup.compile_templates(), 0)
+        self.assertIn('tasks/tasks.html', loader.get_template_cache)
+
+    def test_healthz_touches_no_session_or_database(self):
+        self.client.force_login(User.objects.create_user('ana'))
+        with self.assertNumQueries(0):
+            response = self.client.get('/healthz', headers={'host': 'sonda.interna'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Vary', response)
+        self.assertFalse(response.cookies)
+
+    def test_readyz_waits_for_warmup(self):
+        self.assertEqual(self.client.get('/readyz').status_code, 503)
+        with self.settings(WARMUP=False):
+            warmup.run()
+        with self.assertNumQueries(1):
+            response = self.client.get('/readyz/')
+        self.assertEqual(response.status_code, 200)
+
+    async def test_probes_in_async_chain(self):
+        async def get_response(request):  # pylint: disable=unused-argument
+            return HttpResponse('vista')
+
+        middleware = HealthCheckMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        factory = RequestFactory()
+        self.assertEqual((await middleware(factory.get('/healthz'))).status_code, 200)
+        self.assertEqual((await middleware(factory.get('/readyz'))).status_code, 503)
+        warmup.READY.set()
+        self.assertEqual((await middleware(factory.get('/readyz'))).content, b'ready\n')
+        self.assertEqual((await middleware(factory.get('/tasks/'))).content, b'vista')
+
+
+class ImportTasksTests(TestCase):
+    """
+    manage.py import_tasks
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('ana')
+
+    def _import(self, suffix, content, **options):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as output:
+            output.write(content)
+        self.addCleanup(os.remove, path)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_tasks', path, stdout=stdout, stderr=stderr,
+                     verbosity=0, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv(self):
+        content = ('username,title,descripcion,important,datecompleted\n'
+                   'ana,Uno,desc,true,\n'
+                   'ana,Dos,desc,false,2025-01-02T10:00:00Z\n'
+                   'ana,Tres,desc,0,\n')
+        stdout, _ = self._import('.csv', content, batch_size=2)
+        self.assertIn('3 tareas importadas', stdout)
+        self.assertEqual(Task.objects.filter(user=self.user, important=True).count(), 1)
+        self.assertEqual(Task.objects.filter(datecompleted__isnull=False).count(), 1)
+
+    def test_jsonl_rejects_invalid_rows(self):
+        rows = [
+            {'username': 'ana', 'title': 'Ok', 'descripcion': 'd', 'important': True},
+            {'username': 'nadie', 'title': 'X', 'descripcion': 'd'},
+            {'username': 'ana', 'title': '', 'descripcion': 'd'},
+            {'username': 'ana', 'title': 'x' * 101, 'descripcion': 'd'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\n{roto\n'
+        stdout, stderr = self._import('.jsonl', content)
+        self.assertIn('1 tareas importadas, 4 filas rechazadas', stdout)
+        self.assertIn('usuario desconocido', stderr)
+        self.assertEqual(Task.objects.get().title, 'Ok')
+
+    def test_jsonl_rejects_lines_that_are_not_objects(self):
+        content = '[]\n1\n"x"\n' + json.dumps(
+            {'username': 'ana', 'title': 'Ok', 'descripcion': 'd'}) + '\n'
+        stdout, stderr = self._import('.jsonl', content)
+        self.assertIn('1 tareas importadas, 3 filas rechazadas', stdout)
+        self.assertIn('Línea 1: se esperaba un objeto JSON, no list', stderr)
+        self.assertEqual(Task.objects.get().title, 'Ok')
+
+    def test_jsonl_rejects_non_text_values(self):
+        rows = [
+            {'username': ['ana'], 'title': 'Lista'},
+            {'username': 'ana', 'title': {'a': 1}, 'descripcion': 'd'},
+            {'username': 'ana', 'title': 'Ok', 'descripcion': [1, 2]},
+            {'username': 'ana', 'title': 7, 'descripcion': 1.5},
+        ]
+        content = ''.join(json.dumps(row) + '\n' for row in rows)
+        stdout, stderr = self._import('.jsonl', content)
+        self.assertIn('1 tareas importadas, 3 filas rechazadas', stdout)
+        self.assertIn('Línea 1: username debe ser texto', stderr)
+        self.assertIn('Se esperaba texto, no dict.', stderr)
+        self.assertEqual(Task.objects.values_list('title', 'descripcion').get(), ('7', '1.5'))
+
+    def test_dry_run_inserts_nothing(self):
+        content = json.dumps({'username': 'ana', 'title': 'Ok', 'descripcion': 'd'}) + '\n'
+        stdout, _ = self._import('.jsonl', content, dry_run=True)
+        self.assertIn('1 tareas se importarían, 0 filas rechazadas', stdout)
+        self.assertFalse(Task.objects.exists())
+
+    def test_user_lookup_is_batched(self):
+        content = ''.join(
+            json.dumps({'username': 'ana', 'title': f'T{n}', 'descripcion': 'd'}) + '\n'
+            for n in range(50))
+        stats.rebuild(self.user.pk)
+        # usuarios + savepoint/bulk_create/UPDATE de TaskStats en una
+        # transacción + UPDATE de la versión
+        with self.assertNumQueries(6):
+            self._import('.jsonl', content, batch_size=100)
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """
+    djangocrud.middleware.ProfilingMiddleware
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana')
+        Task.objects.create(title='Pendiente', user=self.user)
+        stats.rebuild(self.user.pk)
+        self.client.force_login(self.user)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_has_server_timing(self):
+        with self.assertLogs('djangocrud.profiling', 'INFO') as logs:
+            response = self.client.get(reverse('list_tasks'))
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        for metric in ('tpl;dur=', 'view;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertEqual(logs.records[0].profile['queries'], 3)
+        self.assertGreater(logs.records[0].profile['template_ms'], 0)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_unsampled_request_has_no_header(self):
+        response = self.client.get(reverse('list_tasks'))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0, PROFILING_SLOW_MS=0)
+    def test_slow_requests_are_logged_without_sampling(self):
+        with self.assertLogs('djangocrud.profiling', 'WARNING') as logs:
+            self.client.get(reverse('list_tasks'))
+        self.assertIn('slow request', logs.output[0])
+
+    def test_template_wrapper_installed_only_when_sampling(self):
+        # pylint: disable=protected-access
+        template_class = django_backend.Template
+        self.addCleanup(setattr, template_class, 'render', template_class.render)
+        template_class.render = project_middleware._original_template_render
+        with self.settings(PROFILING_SAMPLE_RATE=0.0):
+            ProfilingMiddleware(lambda request: None)
+        self.assertIs(template_class.render, project_middleware._original_template_render)
+        with self.settings(PROFILING_SAMPLE_RATE=0.5):
+            ProfilingMiddleware(lambda request: None)
+            ProfilingMiddleware(lambda request: None)
+        self.assertIs(template_class.render, project_middleware._profiled_template_render)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    async def test_async_chain_is_measured_without_sync_hop(self):
+        def query():
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            finally:
+                connection.close()
+
+        async def get_response(request):  # pylint: disable=unused-argument
+            # Como bajo uvicorn: la consulta abre una conexión en otro hilo
+            await sync_to_async(query, thread_sensitive=False)()
+            return HttpResponse('ok')
+
+        middleware = ProfilingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with self.assertLogs('djangocrud.profiling', 'INFO'):
+            response = await middleware(RequestFactory().get('/'))
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+
+class ApiTests(TestCase):
+    """
+    API JSON y GET condicional con ETag.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.task = Task.objects.create(title='Pendiente', descripcion='x', user=self.user)
+        self.client.force_login(self.user)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_tasks')).status_code, 401)
+
+    def test_list_not_modified_runs_no_task_query(self):
+        response = self.client.get(reverse('api_tasks'))
+        self.assertEqual(response.json()['results'][0]['title'], 'Pendiente')
+        etag = response['ETag']
+        # sesión y usuario salen del cache; solo se lee la versión (TaskStats)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api_tasks'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('tasks_taskstats', queries[0]['sql'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_after_write(self):
+        etag = self.client.get(reverse('api_tasks'))['ETag']
+        response = self.client.post(
+            reverse('api_tasks'), {'title': 'Nueva', 'descripcion': 'y'},
+            content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(reverse('api_tasks'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_patch_complete_delete(self):
+        url = reverse('api_task', args=[self.task.pk])
+        response = self.client.patch(url, {'important': True}, content_type='application/json')
+        self.assertTrue(response.json()['important'])
+        self.assertEqual(response.json()['title'], 'Pendiente')
+        response = self.client.post(reverse('api_task_complete', args=[self.task.pk]))
+        self.assertIsNotNone(response.json()['datecompleted'])
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_validation_errors(self):
+        response = self.client.post(reverse('api_tasks'), {'title': ''},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('title', response.json()['errors'])
+
+    def test_other_users_task_is_not_found(self):
+        other = User.objects.create_user('beto', password='secreto123')
+        self.client.force_login(other)
+        response = self.client.get(reverse('api_task', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='tasks.tests')
+class AsyncViewsTests(TestCase):
+    """
+    Las vistas de tasks.async_views con el AsyncClient.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ana', password='secreto123')
+        self.other = User.objects.create_user('beto', password='secreto123')
+        self.task = Task.objects.create(title='Pendiente', user=self.user)
+
+    async def test_list_and_create(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('list_tasks'))
+        self.assertContains(response, 'Pendiente')
+        response = await self.async_client.post(
+            reverse('create_task'), {'title': 'Async', 'descripcion': 'texto'})
+        self.assertRedirects(response, reverse('list_tasks'), fetch_redirect_response=False)
+        response = await self.async_client.get(reverse('list_tasks'))
+        self.assertContains(response, 'Async')
+        response = await self.async_client.get(reverse('list_tasks'), {'q': 'async'})
+        self.assertEqual([task['title'] for task in response.context['tasks']], ['Async'])
+
+    async def test_complete_and_remove(self):
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.post(reverse('complete_task', args=[self.task.pk]))
+        response = await self.async_client.get(reverse('completed_tasks'))
+        self.assertContains(response, 'Pendiente')
+        await self.async_client.post(reverse('remove_task', args=[self.task.pk]))
+        self.assertFalse(await Task.objects.filter(pk=self.task.pk).aexists())
+
+    async def test_detail_is_scoped_to_owner(self):
+        await self.async_client.aforce_login(self.other)
+        response = await self.async_client.get(reverse('task_detail', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_login_required(self):
+        response = await self.async_client.get(reverse('list_tasks'))
+        self.assertEqual(response.status_code, 302)
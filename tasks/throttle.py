@@ -0,0 +1,110 @@
+"""
+Límite de intentos de login, antes de que corra el hash de la contraseña.
+
+Cada POST a CustomLoginView ejecuta PBKDF2 (decenas de ms de CPU); una ráfaga
+de credential stuffing ocupa todos los workers. check() se llama antes de
+validar el formulario y rechaza el intento sin consultar auth_user ni
+calcular ningún hash.
+
+Hay un token bucket por IP y otro por username, guardados en el cache:
+    login:throttle:ip:<ip>
+    login:throttle:username:<sha256 del username normalizado>
+Cada intento consume un token; los tokens se reponen a `per_minute` por
+minuto hasta `burst`. Con el bucket vacío la clave queda bloqueada
+`backoff` segundos, y el bloqueo se duplica en cada vaciado consecutivo
+(hasta `backoff_max`). Un login correcto limpia el bucket del username.
+
+Las lecturas y escrituras no son atómicas: dos workers pueden gastar el mismo
+token. Para un límite de abuso esa imprecisión es aceptable.
+
+Configuración en settings.LOGIN_THROTTLE.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+ATTEMPTS = 'login_attempts_total'
+SHED = {
+    'ip': 'login_attempts_throttled_ip_total',
+    'username': 'login_attempts_throttled_username_total',
+}
+metrics.register(ATTEMPTS, 'Intentos de login recibidos (POST).')
+metrics.register(SHED['ip'], 'Intentos de login rechazados por el límite por IP.')
+metrics.register(SHED['username'], 'Intentos de login rechazados por el límite por username.')
+
+
+def client_ip(request):
+    """
+    IP del cliente según settings.LOGIN_THROTTLE['ip_header']. Con un proxy
+    delante (X-Forwarded-For) se toma la última entrada, la que agregó el
+    proxy propio y el cliente no puede falsificar.
+    """
+    value = request.META.get(settings.LOGIN_THROTTLE['ip_header'], '')
+    return value.split(',')[-1].strip() or request.META.get('REMOTE_ADDR', '')
+
+
+def _username_key(username):
+    digest = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+    return f'login:throttle:username:{digest}'
+
+
+def _keys(request, username):
+    keys = [('ip', f'login:throttle:ip:{client_ip(request)}')]
+    if username:
+        keys.append(('username', _username_key(username)))
+    return keys
+
+
+def _take(key, burst, per_minute, now):
+    """
+    Consume un token del bucket `key`. Devuelve los segundos de espera si el
+    intento se rechaza o None si se acepta.
+    """
+    config = settings.LOGIN_THROTTLE
+    state = cache.get(key) or {'tokens': burst, 'updated': now, 'strikes': 0, 'until': 0}
+    if now < state['until']:
+        return state['until'] - now
+
+    state['tokens'] = min(burst, state['tokens'] + (now - state['updated']) * per_minute / 60)
+    state['updated'] = now
+    if state['tokens'] >= burst:
+        state['strikes'] = 0
+
+    wait = None
+    if state['tokens'] >= 1:
+        state['tokens'] -= 1
+    else:
+        wait = min(config['backoff_max'], config['backoff'] * 2 ** state['strikes'])
+        state['strikes'] += 1
+        state['until'] = now + wait
+    # El estado sobrevive al bloqueo más largo posible
+    cache.set(key, state, config['backoff_max'] + 60 * burst / max(per_minute, 1))
+    return wait
+
+
+def check(request, username):
+    """
+    Registra un intento de login. Devuelve None si puede continuar o los
+    segundos (enteros, para Retry-After) que debe esperar.
+    """
+    metrics.incr(ATTEMPTS)
+    now = time.time()
+    for scope, key in _keys(request, username):
+        limits = settings.LOGIN_THROTTLE[scope]
+        wait = _take(key, limits['burst'], limits['per_minute'], now)
+        if wait is not None:
+            metrics.incr(SHED[scope])
+            return max(1, math.ceil(wait))
+    return None
+
+
+def reset(username):
+    """
+    Limpia el bucket del username después de un login correcto.
+    """
+    cache.delete(_username_key(username))
@@ -0,0 +1,138 @@
+"""
+Cache del usuario autenticado.
+
+AuthenticationMiddleware carga request.user en cada petición con
+ModelBackend.get_user(), que hace un SELECT sobre auth_user. Junto con la
+lectura de la sesión (backend cached_db, ver settings.SESSION_ENGINE) son dos
+consultas antes de que la vista haga la primera suya.
+
+CachedModelBackend guarda el usuario en el cache por defecto bajo
+    auth:user:<user_id>
+(junto con una generación, ver invalidate()) y la entrada se borra:
+    - al cerrar sesión (señal user_logged_out, views.close_session),
+    - en cada save() o delete() del usuario: cambio de contraseña, de
+      is_active, y también el update de last_login que hace login().
+
+Así un usuario desactivado deja de entrar en la petición siguiente (get_user
+vuelve a comprobar is_active como ModelBackend) y un cambio de contraseña
+invalida las otras sesiones por el hash de sesión, igual que sin cache.
+Los QuerySet.update() sobre User no envían señales: después de uno hay que
+llamar a invalidate().
+
+settings.py solo lo activa con un cache compartido (CACHE_SHARED) o en
+DEBUG: con LocMemCache y varios workers, la invalidación no llegaría a los
+demás procesos.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import metrics
+
+HITS = 'auth_user_cache_hits_total'
+MISSES = 'auth_user_cache_misses_total'
+metrics.register(HITS, 'Usuarios autenticados leídos desde el cache.')
+metrics.register(MISSES, 'Usuarios autenticados leídos desde la BBDD.')
+
+
+def _key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _generation_key(user_id):
+    return f'auth:user:gen:{user_id}'
+
+
+def _new_generation():
+    # Como en taskcache: si la generación se pierde, la nueva arranca desde el
+    # reloj y no repite un número que tenga una entrada vieja guardada
+    return time.time_ns() // 1000
+
+
+def invalidate(*user_ids):
+    """
+    Descarta el usuario cacheado; la próxima petición lo lee de la BBDD.
+
+    Además de borrar la entrada cambia la generación del usuario: un
+    get_user() que leyó la BBDD antes de la invalidación y guarda después
+    lo hace con la generación vieja, y esa entrada ya no se acepta.
+    """
+    for user_id in user_ids:
+        try:
+            cache.incr(_generation_key(user_id))
+        except ValueError:
+            cache.set(_generation_key(user_id), _new_generation(), timeout=None)
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def _cached(values, user_id):
+    """
+    (generación actual, usuario cacheado o None) a partir del get_many().
+    """
+    generation = values.get(_generation_key(user_id))
+    entry = values.get(_key(user_id))
+    if generation is not None and entry is not None and entry[0] == generation:
+        return generation, entry[1]
+    return generation, None
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend con get_user() servido desde el cache. authenticate() no
+    cambia: el login siempre verifica la contraseña contra la BBDD.
+
+    Cada entrada guarda (generación, usuario) y solo vale si la generación
+    sigue siendo la actual (ver invalidate()).
+    """
+
+    def get_user(self, user_id):
+        generation, user = _cached(
+            cache.get_many([_generation_key(user_id), _key(user_id)]), user_id)
+        if user is None:
+            metrics.incr(MISSES)
+            if generation is None:
+                cache.add(_generation_key(user_id), _new_generation(), timeout=None)
+                generation = cache.get(_generation_key(user_id))
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(_key(user_id), (generation, user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        metrics.incr(HITS)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        generation, user = _cached(
+            await cache.aget_many([_generation_key(user_id), _key(user_id)]), user_id)
+        if user is None:
+            await metrics.aincr(MISSES)
+            if generation is None:
+                await cache.aadd(_generation_key(user_id), _new_generation(), timeout=None)
+                generation = await cache.aget(_generation_key(user_id))
+            try:
+                user = await get_user_model()._default_manager.aget(pk=user_id)  # pylint: disable=protected-access
+            except get_user_model().DoesNotExist:
+                return None
+            await cache.aset(_key(user_id), (generation, user),
+                             settings.AUTH_USER_CACHE_TIMEOUT)
+        else:
+            await metrics.aincr(HITS)
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(user_logged_out)
+def _logged_out(sender, request, user, **kwargs):  # pylint: disable=unused-argument
+    if user is not None:
+        invalidate(user.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def _user_changed(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate(instance.pk)
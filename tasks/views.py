@@ -12,13 +12,23 @@ from django.contrib.auth.views import LoginView
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
-from django.http import Http404
-from django.utils import timezone
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+
+from djangocrud.replicas import read_from_replica
 
 from .formauth import RegistroForm
 from .signin import LoginForm
 from .taskform import TaskForm
-from .models import Task
+from .models import Task, TaskArchive
+from .pagination import KeysetPage, KeysetPaginator, MergedKeysetPaginator, decode_cursor
+from . import bloom, bulk, export, metrics, search, stats, taskcache, throttle, writes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,6 +52,27 @@ class CustomLoginView(LoginView):
     # redirígelo automáticamente a la URL de éxito
     redirect_authenticated_user = True  # Evita que usuarios logueados vean el login
 
+    def post(self, request, *args, **kwargs):
+        """
+        Antes de validar el formulario (y de calcular el hash de la
+        contraseña) pasa el intento por tasks.throttle; si se excede el
+        límite responde 429 sin tocar auth_user.
+        """
+        retry_after = throttle.check(request, request.POST.get('username', ''))
+        if retry_after is None:
+            return super().post(request, *args, **kwargs)
+        messages.error(request, f'Demasiados intentos de inicio de sesión. '
+                                f'Vuelve a intentarlo en {retry_after} segundos.')
+        response = self.render_to_response(
+            self.get_context_data(form=self.get_form_class()(request)))
+        response.status_code = 429
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def form_valid(self, form):
+        throttle.reset(form.cleaned_data['username'])
+        return super().form_valid(form)
+
     def get_success_url(self):
         """
         Sobreescribo el metodo get_success_url para que cuando la autenticación
@@ -64,35 +95,137 @@ def signup(request):
     """
     if request.method == 'POST':
         form = RegistroForm(request.POST)
-        if form.is_valid():
-            form.save()
+        # save() devuelve None si el username ya existía (error en el form)
+        if form.is_valid() and form.save() is not None:
             return redirect('signin')  # o a la página que quieras
     else:
         form = RegistroForm()
     return render(request, 'tasks/signup.html', {'form': form})
 
 
+def check_username(request):
+    """
+    Disponibilidad de ?username= para el formulario de registro, en JSON.
+    Los nombres que el filtro de Bloom descarta se responden sin consultar
+    la BBDD; solo los que quizá existen se confirman con un SELECT.
+    """
+    username = request.GET.get('username', '').strip()
+    field = User._meta.get_field('username')  # pylint: disable=protected-access
+    try:
+        field.run_validators(username)
+        if not username:
+            raise ValidationError('Ingrese un nombre de usuario.')
+    except ValidationError as exc:
+        return JsonResponse({'username': username, 'available': False,
+                             'error': ' '.join(exc.messages)})
+    available = (not bloom.might_exist(username)
+                 or not User.objects.filter(username=username).exists())
+    return JsonResponse({'username': username, 'available': available})
+
+
+# Columnas que usa tasks/tasks.html; las filas se cachean como dicts
+LIST_FIELDS = ('id', 'title', 'descripcion', 'created', 'datecompleted', 'important')
+
+
+def page_cursors(request):
+    """
+    Cursores ?after / ?before de la petición. Los inválidos se descartan para
+    que no lleguen a la clave del cache.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    return (after if decode_cursor(after) else None,
+            before if decode_cursor(before) else None)
+
+
+def completed_paginator(user):
+    """
+    Paginador de las tareas completadas del usuario: las de Task y las de
+    TaskArchive mezcladas por (datecompleted, id). Las archivadas llevan
+    archived=True (no tienen detalle ni acciones).
+    """
+    return MergedKeysetPaginator([
+        Task.objects.filter(user=user, datecompleted__isnull=False).values(*LIST_FIELDS),
+        TaskArchive.objects.filter(user=user).values(*LIST_FIELDS).annotate(
+            archived=Value(True)),
+    ], 'datecompleted', descending=True)
+
+
+def search_query(request):
+    """
+    Texto de búsqueda ?q= de la petición, sin espacios sobrantes.
+    """
+    return request.GET.get('q', '').strip()
+
+
+def search_results(listtask, query):
+    """
+    Queryset de values(*LIST_FIELDS) con las tareas de `listtask` que
+    coinciden con `query`, de la más relevante a la menos, acotado a
+    TASKS_SEARCH_LIMIT. Se muestra en una sola página: el orden por relevancia
+    no sirve de clave para la paginación por cursor.
+    """
+    return search.search(listtask.values(*LIST_FIELDS), query)[:settings.TASKS_SEARCH_LIMIT]
+
+
+def _list_page(request, status, listtask, paginator):
+    """
+    Página de la lista: resultados de ?q= (sin cache, el texto es libre) o la
+    página por cursor desde el cache del usuario.
+    """
+    query = search_query(request)
+    if query:
+        return KeysetPage(list(search_results(listtask, query)))
+    return _cached_page(request, status, paginator)
+
+
+def _cached_page(request, status, paginator):
+    """
+    Devuelve la página pedida (?after / ?before) desde el cache del usuario,
+    construyéndola con el paginador solo si no está cacheada.
+    """
+    after, before = page_cursors(request)
+    return taskcache.get_or_build(
+        request, f'{status}:{after}:{before}',
+        lambda: paginator.page(after=after, before=before))
+
+
 @login_required
+@read_from_replica
 def show_tasks(request):
     """
     Funcion que muestra o enlistas las tareas(Tasks)
+    Paginada por cursor sobre (created, id): ?after=<cursor> o ?before=<cursor>
+    Con ?q=<texto> muestra las que coinciden, ordenadas por relevancia.
     """
     listtask = Task.objects.filter(
         user=request.user, datecompleted__isnull=True
     )
-    return render(request, 'tasks/tasks.html', {'tasks': listtask,
+    page = _list_page(request, 'pending', listtask,
+                      KeysetPaginator(listtask.values(*LIST_FIELDS), 'created'))
+    return render(request, 'tasks/tasks.html', {'tasks': page.object_list,
+                                                'page': page,
+                                                'query': search_query(request),
                                                 'status': 'Pending'})
 
 
 @login_required
+@read_from_replica
 def completed_tasks(request):
     """
     Funcion que muestra o enlistas las tareas(Tasks)
+    Paginada por cursor sobre (datecompleted, id), de la más reciente a la
+    más antigua. Admite ?q= como show_tasks (solo sobre las no archivadas).
+    Al avanzar de página se llega a las tareas archivadas (TaskArchive) sin
+    que cambie nada para el usuario.
     """
     listtask = Task.objects.filter(
         user=request.user, datecompleted__isnull=False
-    ).order_by('-datecompleted')
-    return render(request, 'tasks/tasks.html', {'tasks': listtask,
+    )
+    page = _list_page(request, 'completed', listtask, completed_paginator(request.user))
+    return render(request, 'tasks/tasks.html', {'tasks': page.object_list,
+                                                'page': page,
+                                                'query': search_query(request),
                                                 'status': 'Completed'})
 
 
@@ -107,7 +240,10 @@ def create_task(request):
                 taskfrom = form.save(commit=False)
                 # Se asigna manualmente el usuario autenticado (request.user) al campo user del modelo.
                 taskfrom.user = request.user
-                taskfrom.save()
+                with transaction.atomic():
+                    taskfrom.save()
+                    stats.record(request.user.pk, after=stats.state(taskfrom))
+                taskcache.bump_version(request.user.pk)
                 messages.success(
                     request, "✅ La tarea fue creada exitosamente.")
                 return redirect('list_tasks')
@@ -122,6 +258,7 @@ def create_task(request):
 
 
 @login_required
+@read_from_replica
 def show_task_detail(request, id_task):
 
     if request.method == 'GET':
@@ -138,40 +275,54 @@ def show_task_detail(request, id_task):
             raise Http404(id_task)
     else:
         filter_task = get_object_or_404(Task, pk=id_task, user=request.user)
+        # El form modifica la instancia al validar: se guarda el estado previo
+        before = stats.state(filter_task)
         form = TaskForm(request.POST, instance=filter_task)
         try:
             if form.is_valid():
-                # Aquí ya sabes que el usuario está autenticado
-                taskfrom = form.save(commit=False)
-                # Se asigna manualmente el usuario autenticado (request.user) al campo user del modelo.
-                taskfrom.user = request.user
-                taskfrom.save()
-                messages.success(
-                    request, "✅ La tarea se actualizó exitosamente.")
-                return redirect('list_tasks')
+                # Solo los campos cambiados y solo si nadie editó la tarea
+                # desde que se abrió el formulario
+                if writes.update(filter_task, writes.changed_fields(form),
+                                 form.submitted_version(), before):
+                    messages.success(
+                        request, "✅ La tarea se actualizó exitosamente.")
+                    return redirect('list_tasks')
+                return task_conflict(request, id_task)
             else:
                 messages.error(
                     request, "❌ El formulario tiene errores. Revisa los campos.")
         except Exception as e:
             messages.error(request, f"⚠️ Ocurrió un error inesperado: {e}")
+        return render(request, 'tasks/task_detail.html',
+                      {'form': form, 'filter_task': filter_task})
+
+
+def task_conflict(request, id_task):
+    """
+    409 con la tarea como quedó: otra petición la editó después de que se
+    abriera el formulario y la edición no se guardó.
+    """
+    current = get_object_or_404(Task, pk=id_task, user=request.user)
+    messages.error(
+        request, "⚠️ La tarea cambió mientras la editabas. Revisa los datos "
+                 "actuales y vuelve a guardar.")
+    return render(request, 'tasks/task_detail.html',
+                  {'form': TaskForm(instance=current), 'filter_task': current},
+                  status=409)
 
 
 @login_required
+@require_POST
 def complete_task(request, id_task):
-    try:
-        # filter_task = get_object_or_404(Task, pk=id_task)
-        filter_task = get_object_or_404(Task, pk=id_task, user=request.user)
-        logger.debug("👉 Método HTTP: %s", request.method)
-        if request.method == 'POST':
-            logger.debug("👉 Antes de actualizar: %s",
-                         filter_task.datecompleted)
-            filter_task.datecompleted = timezone.now()
-            filter_task.save()
-            logger.debug("👉 Después de actualizar: %s",
-                         filter_task.datecompleted)
-            return redirect('list_tasks')
-    except Task.DoesNotExist:
-        raise Http404(id_task)
+    """
+    Completa la tarea con un único UPDATE condicionado (tasks.writes).
+    Completar una tarea ya completada no cambia su fecha.
+    """
+    if not writes.complete(request.user.pk, id_task):
+        if not Task.objects.filter(pk=id_task, user=request.user).exists():
+            raise Http404(id_task)
+        messages.info(request, "La tarea ya estaba completada.")
+    return redirect('list_tasks')
 
 
 @login_required
@@ -180,12 +331,61 @@ def remove_task(request, id_task):
         # filter_task = get_object_or_404(Task, pk=id_task)
         filter_task = get_object_or_404(Task, pk=id_task, user=request.user)
         if request.method == 'POST':
-            filter_task.delete()
+            with transaction.atomic():
+                filter_task.soft_delete()
+                stats.record(request.user.pk, before=stats.state(filter_task))
+            taskcache.bump_version(request.user.pk)
             return redirect('list_tasks')
     except Task.DoesNotExist:
         raise Http404(id_task)
 
 
+@login_required
+@require_POST
+def bulk_tasks(request):
+    """
+    Aplica una acción (complete, toggle_important, delete) a todas las tareas
+    seleccionadas en la lista con una sola sentencia SQL y vuelve a la página
+    de origen.
+    """
+    action = request.POST.get('action')
+    ids = bulk.parse_ids(request.POST.getlist('ids'))
+    if action not in bulk.ACTIONS:
+        messages.error(request, "❌ Acción no válida.")
+    elif not ids:
+        messages.error(request, "❌ No seleccionaste ninguna tarea.")
+    else:
+        affected = bulk.apply(request.user, action, ids)
+        messages.success(
+            request, f"✅ {affected} tarea(s) {bulk.ACTIONS[action]}.")
+
+    next_url = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={request.get_host()},
+            require_https=request.is_secure()):
+        next_url = 'list_tasks'
+    return redirect(next_url)
+
+
+@login_required
+def export_tasks(request):
+    """
+    Descarga las tareas del usuario en streaming.
+    ?format=csv|ndjson  ?status=all|pending|completed  ?gzip=1
+    """
+    fmt = request.GET.get('format', 'csv')
+    status = request.GET.get('status', 'all')
+    if fmt not in export.FORMATS or status not in export.STATUS_FILTERS:
+        raise Http404(fmt)
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        export.stream(request.user, fmt, status, compress),
+        content_type='application/gzip' if compress else export.FORMATS[fmt][0])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(request.user, fmt, compress)}"')
+    return response
+
+
 @login_required
 def close_session(request):
     """
@@ -194,3 +394,20 @@ def close_session(request):
     """
     logout(request)
     return redirect('home')
+
+
+def show_metrics(request):
+    """
+    Expone los contadores de tasks.metrics en formato Prometheus.
+    Si METRICS_TOKEN está configurado se exige "Authorization: Bearer <token>";
+    si no, solo los usuarios staff pueden verlos.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = request.headers.get('Authorization') == f'Bearer {token}'
+    else:
+        allowed = request.user.is_staff
+    if not allowed:
+        raise Http404
+    return HttpResponse(metrics.render(),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
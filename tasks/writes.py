@@ -0,0 +1,106 @@
+"""
+Escrituras de una tarea con una sola sentencia condicionada.
+
+complete() no lee la tarea antes de completarla:
+    UPDATE tasks_task SET datecompleted = %s, version = version + 1
+    WHERE id = %s AND user_id = %s AND datecompleted IS NULL
+      AND deleted_at IS NULL
+    RETURNING important
+Dos peticiones que completan la misma tarea a la vez no se pisan: la segunda
+no encuentra la fila pendiente y no cambia nada. RETURNING (PostgreSQL y
+SQLite >= 3.35) devuelve lo que hace falta para ajustar TaskStats.
+
+update() es el control de concurrencia optimista de las ediciones: cada
+tarea tiene un número de versión, que el formulario y la API devuelven con
+los datos, y el UPDATE solo escribe los campos cambiados si la versión
+sigue siendo la que leyó el cliente. Si otra petición la cambió antes, no
+escribe nada y la vista responde 409 en lugar de perder una de las dos
+ediciones.
+"""
+from asgiref.sync import sync_to_async
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from . import stats, taskcache
+
+_COMPLETE_SQL = (
+    'UPDATE {table} SET datecompleted = %s, version = version + 1 '
+    'WHERE id = %s AND user_id = %s AND datecompleted IS NULL AND deleted_at IS NULL '
+    'RETURNING important'
+)
+
+
+def complete(user_id, task_id):
+    """
+    Completa la tarea si es del usuario y estaba pendiente. Devuelve False
+    si no cambió nada (no existe, es de otro, está borrada o ya estaba
+    completada).
+    """
+    using = router.db_for_write(Task)
+    connection = connections[using]
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _COMPLETE_SQL.format(table=Task._meta.db_table),  # pylint: disable=protected-access
+                [now, task_id, user_id])
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        important = bool(row[0])
+        stats.record(user_id, before=(True, important), after=(False, important))
+    taskcache.bump_version(user_id)
+    return True
+
+
+async def acomplete(user_id, task_id):
+    """
+    Versión async de complete(): el cursor de Django no tiene API async.
+    """
+    return await sync_to_async(complete)(user_id, task_id)
+
+
+def changed_fields(form):
+    """
+    Campos del modelo que el formulario cambió respecto de la instancia.
+    """
+    return [field for field in form.changed_data if field in form.Meta.fields]
+
+
+def _unchanged(task, version):
+    return Task.objects.filter(pk=task.pk, user_id=task.user_id, version=version)
+
+
+def update(task, fields, version, before):
+    """
+    Guarda `fields` de `task` (ya modificada) si su versión en la BBDD sigue
+    siendo `version`. `before` es stats.state() de la tarea antes de
+    modificarla. Devuelve False si hubo un conflicto.
+    """
+    if not fields:
+        return task.version == version
+    with transaction.atomic():
+        if not _unchanged(task, version).update(
+                version=F('version') + 1, **{field: getattr(task, field) for field in fields}):
+            return False
+        stats.record(task.user_id, before, stats.state(task))
+    task.version = version + 1
+    taskcache.bump_version(task.user_id)
+    return True
+
+
+async def aupdate(task, fields, version, before):
+    """
+    Versión async de update().
+    """
+    if not fields:
+        return task.version == version
+    if not await _unchanged(task, version).aupdate(
+            version=F('version') + 1, **{field: getattr(task, field) for field in fields}):
+        return False
+    await stats.arecord(task.user_id, before, stats.state(task))
+    task.version = version + 1
+    await taskcache.abump_version(task.user_id)
+    return True